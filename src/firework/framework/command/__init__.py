@@ -1,4 +1,6 @@
 from .model import YanagiCommand as YanagiCommand
+from .model import YanagiParseResult as YanagiParseResult
+from .router import CommandRouter as CommandRouter
 from .specifiers import fragment as fragment
 from .specifiers import fragment_union as fragment_union
 from .specifiers import header_fragment as header_fragment
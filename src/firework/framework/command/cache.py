@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import pickle
+import sys
+from contextlib import suppress
+from dataclasses import fields as dc_fields
+from dataclasses import is_dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import firework.util
+
+from .core import model as sistana_model
+from .core.model.pattern import SubcommandPattern
+from .globals import GLBOAL_SUBCOMMANDS, GLOBAL_OPTIONS_BIND
+from .metadata import FragmentMetadata, UnionMetadata
+
+if TYPE_CHECKING:
+    from .model import YanagiCommandBase
+
+# NOTE: bump when the layout of the cache itself changes,
+#       changes of the pickled classes are detected from their sources (see `_layout_digest`).
+CACHE_VERSION = b"2"
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def field_metadata(cls: type):
+    for dc_field in dc_fields(cls):
+        union = UnionMetadata.get(dc_field)
+
+        if union is not None:
+            yield from union.twins
+        else:
+            yield dc_field, FragmentMetadata.get_or_default(dc_field)
+
+
+def _live_objects(cls: type[YanagiCommandBase]) -> list[Any]:
+    # NOTE: objects owned by the class definition (and the global binds) are referenced by position instead of serialized,
+    #       so callables such as lambdas need not be picklable, and the pattern loaded shares them with the class.
+    objects: list[Any] = [cls, GLBOAL_SUBCOMMANDS, GLOBAL_OPTIONS_BIND]
+
+    for dc_field, metadata in field_metadata(cls):
+        objects.extend(
+            (
+                dc_field.default,
+                dc_field.default_factory,
+                metadata.group,
+                metadata.capture,
+                metadata.receiver,
+                metadata.validator,
+                metadata.transformer,
+            )
+        )
+
+    return objects
+
+
+def _layout_digest():
+    # NOTE: entries hold objects of the sistana model and of `firework.util` (tracks, fragments, tries...),
+    #       any change of their sources (e.g. a library upgrade) invalidates every entry.
+    digest = hashlib.sha256(CACHE_VERSION)
+
+    for package in (sistana_model, firework.util):
+        for path in sorted(Path(package.__file__).parent.glob("*.py")):
+            digest.update(path.read_bytes())
+
+    return digest.digest()
+
+
+def _intact(obj: Any):
+    if is_dataclass(obj):
+        names = [dc_field.name for dc_field in dc_fields(obj)]
+    else:
+        names = [slot for klass in type(obj).__mro__ for slot in getattr(klass, "__slots__", ())]
+
+    return all(hasattr(obj, name) for name in names)
+
+
+def _intact_pattern(pattern: Any):
+    if not isinstance(pattern, SubcommandPattern) or not _intact(pattern):
+        return False
+
+    preset = pattern.preset
+    tracks = [preset.subcommand_track, *preset.option_tracks.values()]
+
+    return _intact(preset) and all(_intact(track) and all(_intact(frag) for frag in track.fragments) for track in tracks)
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO, objects: list[Any]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.index = {id(obj): ix for ix, obj in enumerate(objects) if not isinstance(obj, _PLAIN_TYPES)}
+
+    def persistent_id(self, obj: Any):
+        return self.index.get(id(obj))
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, objects: list[Any]):
+        super().__init__(file)
+        self.objects = objects
+
+    def persistent_load(self, pid: int):
+        return self.objects[pid]
+
+
+class PatternCache:
+    """An on-disk cache of the patterns built from Yanagi command classes.
+
+    Entries are keyed by the source of the module defining the command class, any change in that module invalidates
+    the entries of its classes. Changes elsewhere (e.g. a base class in another module) are not detected,
+    clear the directory in this case.
+    Entries are unpickled when loaded, so the directory must be trusted (writable by the application only).
+    Set it to `YANAGI_PATTERN_CACHE` before the command modules are imported.
+    """
+
+    __slots__ = ("digests", "directory", "layout")
+
+    directory: Path
+    digests: dict[str, bytes | None]
+    layout: bytes | None
+
+    def __init__(self, directory: str | os.PathLike[str]):
+        self.directory = Path(directory)
+        self.digests = {}
+        self.layout = None
+
+    def _module_digest(self, module_name: str):
+        if module_name in self.digests:
+            return self.digests[module_name]
+
+        module = sys.modules.get(module_name)
+        file = getattr(module, "__file__", None)
+
+        try:
+            digest = hashlib.sha256(Path(file).read_bytes()).digest() if file is not None else None
+        except OSError:
+            digest = None
+
+        self.digests[module_name] = digest
+        return digest
+
+    def path_of(self, cls: type[YanagiCommandBase]) -> Path | None:
+        digest = self._module_digest(cls.__module__)
+
+        if digest is None:
+            return
+
+        if self.layout is None:
+            self.layout = _layout_digest()
+
+        key = hashlib.sha256(b"\0".join((self.layout, digest, cls.__qualname__.encode()))).hexdigest()
+        return self.directory / f"{cls.__module__}-{key[:32]}.pickle"
+
+    def load(self, cls: type[YanagiCommandBase]) -> tuple[SubcommandPattern, dict[str, str]] | None:
+        path = self.path_of(cls)
+
+        if path is None:
+            return
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return
+
+        try:
+            pattern, mangled_names = _Unpickler(io.BytesIO(data), _live_objects(cls)).load()
+        except Exception:
+            # NOTE: a broken or incompatible entry, it is rebuilt and overwritten by the caller.
+            return
+
+        # NOTE: objects of a stale layout may load fine while missing attributes, which would only fail when parsing.
+        if not _intact_pattern(pattern) or not isinstance(mangled_names, dict):
+            return
+
+        return pattern, mangled_names
+
+    def store(self, cls: type[YanagiCommandBase], pattern: SubcommandPattern, mangled_names: dict[str, str]):
+        path = self.path_of(cls)
+
+        if path is None:
+            return
+
+        buffer = io.BytesIO()
+
+        try:
+            _Pickler(buffer, _live_objects(cls)).dump((pattern, mangled_names))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # NOTE: something outside of the class definition is not picklable, the class is just not cached.
+            return
+
+        temp = path.with_suffix(f".{os.getpid()}.tmp")
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp.write_bytes(buffer.getvalue())
+            temp.replace(path)
+        except OSError:
+            # NOTE: the cache must never break the import of commands, the class is just not cached.
+            with suppress(OSError):
+                temp.unlink(missing_ok=True)
@@ -12,7 +12,15 @@ from .analyzer import Accepted as Accepted
 from .analyzer import LoopflowRejectReason as LoopflowRejectReason
 from .analyzer import LoopflowResult as LoopflowResult
 from .analyzer import Rejected as Rejected
+from .analyzer import Suspended as Suspended
 from .analyzer import analyze_loopflow as analyze_loopflow
+from .batch import AnalyzeSummary as AnalyzeSummary
+from .batch import analyze_many as analyze_many
+from .batch import settle_deferred as settle_deferred
+from .batch import summarize as summarize
+from .codegen import GeneratedParser as GeneratedParser
+from .debug import TRACE_RECORDER as TRACE_RECORDER
+from .debug import TraceRecorder as TraceRecorder
 from .err import CaptureRejected as CaptureRejected
 from .err import ParseCancelled as ParseCancelled
 from .err import ParsePanic as ParsePanic
@@ -23,10 +31,15 @@ from .err import RegexMismatch as RegexMismatch
 from .err import TransformPanic as TransformPanic
 from .err import UnexpectedType as UnexpectedType
 from .err import ValidateRejected as ValidateRejected
+from .instrument import INSTRUMENTATION as INSTRUMENTATION
+from .instrument import Instrumentation as Instrumentation
+from .instrument import PatternStats as PatternStats
 from .model import AccumRx as AccumRx
 from .model import AnalyzeSnapshot as AnalyzeSnapshot
 from .model import Capture as Capture
 from .model import CaptureResult as CaptureResult
+from .model import CompiledPattern as CompiledPattern
+from .model import CompiledSnapshot as CompiledSnapshot
 from .model import ConstRx as ConstRx
 from .model import CountRx as CountRx
 from .model import Mix as Mix
@@ -41,6 +54,12 @@ from .model import RxFetch as RxFetch
 from .model import RxPrev as RxPrev
 from .model import RxPut as RxPut
 from .model import SimpleCapture as SimpleCapture
+from .model import SnapshotPool as SnapshotPool
 from .model import SubcommandPattern as SubcommandPattern
 from .model import Track as Track
 from .model.fragment import Fragment as Fragment
+from .speculative import ReplayBuffer as ReplayBuffer
+from .speculative import SpeculativeGroup as SpeculativeGroup
+from .suggest import Suggestions as Suggestions
+from .suggest import suggest as suggest
+from .suggest import suggest_snapshot as suggest_snapshot
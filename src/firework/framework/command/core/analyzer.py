@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING, Generic, TypeAlias, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeAlias, TypeVar, overload
 
 from elaina_segment.err import OutOfData
 
+from .debug import TRACE_RECORDER
 from .err import ParsePanic, ParseRejected
+from .instrument import INSTRUMENTATION, Probe
+from .model.compiled import path_table
 from .model.snapshot import AnalyzeSnapshot, ProcessingState
 
 if TYPE_CHECKING:
@@ -47,6 +50,16 @@ class Accepted(Generic[T]):
     def mix(self):
         return self.snapshot.mix
 
+    @property
+    def pending(self):
+        return bool(self.snapshot.mix.pending)
+
+    async def resolve(self, limit: int | None = None):
+        """Resolve the async transformers of the fragments concurrently, see `Mix.resolve`."""
+
+        await self.snapshot.mix.resolve(limit)
+        return self
+
     # TODO: more adorable methods
 
 
@@ -58,8 +71,104 @@ class Rejected(Generic[T]):
     snapshot: AnalyzeSnapshot
     buffer: Buffer[T]
 
+    # NOTE: the offending segment, recorded for `header_mismatch` and `unexpected_segment`.
+    segment: Any = None
+
+    def suggestions(self, limit: int = 3, max_distance: int = 2) -> list[str]:
+        """Known keywords close to the offending segment ("did you mean"), nearest first.
+
+        Keywords are the root header and aliases for `header_mismatch`, and subcommands and option triggers
+        available on the current path for `unexpected_segment`. The index is a trie searched with pruning,
+        built on demand and kept with the path table when the pattern is compiled.
+        """
+
+        if not isinstance(self.segment, str):
+            return []
+
+        table = path_table(self.snapshot)
+
+        if self.reason is LoopflowRejectReason.header_mismatch:
+            index = table.headers()
+        elif self.reason is LoopflowRejectReason.unexpected_segment:
+            index = table.keywords()
+        else:
+            return []
+
+        return [keyword for keyword, _ in index.nearest(self.segment, limit, max_distance)]
+
+
+@dataclass
+class Suspended(Generic[T]):
+    """The buffer ran out in incremental mode, the snapshot keeps every progress made so far.
+
+    Push more segments into the buffer (`buffer.pushleft(...)`, the buffer is empty at this point)
+    and call `analyze_loopflow` with the same snapshot to continue, or `finish` to settle it as is.
+    """
+
+    snapshot: AnalyzeSnapshot
+    buffer: Buffer[T]
+
+    @property
+    def mix(self):
+        return self.snapshot.mix
+
+    @property
+    def satisfied(self):
+        return self.snapshot.mix.satisfied
+
+    def resume(self, *segments: Any) -> LoopflowResult[T] | Suspended[T]:
+        self.buffer.pushleft(*segments)
+        return analyze_loopflow(self.snapshot, self.buffer, incremental=True)
+
+    def finish(self) -> LoopflowResult[T]:
+        return analyze_loopflow(self.snapshot, self.buffer)
+
+
+@overload
+def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T], *, incremental: Literal[False] = False) -> LoopflowResult[T]: ...
+
+
+@overload
+def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T], *, incremental: bool) -> LoopflowResult[T] | Suspended[T]: ...
+
+
+def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T], *, incremental: bool = False) -> LoopflowResult[T] | Suspended[T]:
+    instrumentation = INSTRUMENTATION.get()
+    recorder = TRACE_RECORDER.get()
+
+    if instrumentation is None and recorder is None:
+        return _loopflow(snapshot, buffer, incremental=incremental)
+
+    probe = Probe(snapshot, buffer, recorder)
+
+    try:
+        response = _loopflow(snapshot, probe, incremental=incremental)  # type: ignore
+    except BaseException as e:
+        probe.close(e)
 
-def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowResult[T]:
+        if instrumentation is not None:
+            instrumentation.record_panic(snapshot, probe)
+
+        raise
+
+    response.buffer = buffer
+
+    if isinstance(response, Rejected):
+        probe.close(response.reason)
+
+        if instrumentation is not None:
+            instrumentation.record(snapshot, probe, response.reason)
+    else:
+        suspended = isinstance(response, Suspended)
+        probe.close("suspended" if suspended else "accepted")
+
+        if instrumentation is not None:
+            instrumentation.record(snapshot, probe, None, suspended=suspended)
+
+    return response
+
+
+def _loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T], *, incremental: bool) -> LoopflowResult[T] | Suspended[T]:
     mix = snapshot.mix
 
     while True:
@@ -69,6 +178,9 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
         try:
             token = buffer.next(context.separators)
         except OutOfData:
+            if incremental:
+                return Suspended(snapshot, buffer)
+
             if mix.satisfied:
                 mix.complete()
                 snapshot.determine()
@@ -77,8 +189,8 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
             # NOTE: If the option track is not satisfied, it will be reset.
             #       Consumed data will not return back to the buffer.
             if state is ProcessingState.OPTION:
-                owner, keyword, _ = snapshot.option  # type: ignore
-                mix.option_tracks[owner, keyword].reset()  # type: ignore
+                tid = snapshot.option_id
+                mix.tracks[tid].reset(mix, tid)
 
             return Rejected(
                 reason=LoopflowRejectReason.unsatisfied,
@@ -141,10 +253,11 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
                     exception=None,
                     snapshot=snapshot,
                     buffer=buffer,
+                    segment=token.val,
                 )
 
-            track = mix.command_tracks[tuple(snapshot.command)]
-            track.emit_header(mix, token.val)
+            tid = snapshot.command_id
+            mix.tracks[tid].emit_header(mix, tid, token.val)
 
             snapshot.state = ProcessingState.COMMAND
             continue
@@ -158,13 +271,13 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
                     # NOTE: Option -> Subcommand, should check if the current option is satisfied.
 
                     # NOTE: "_" is current option, reversed for the future.
-                    owner, keyword, _ = snapshot.option  # type: ignore
-                    current_track = mix.option_tracks[owner, keyword]
+                    tid = snapshot.option_id
+                    current_track = mix.tracks[tid]
 
-                    if current_track.satisfied:
-                        current_track.complete(mix)
+                    if mix.cursors[tid] >= current_track.required:
+                        current_track.complete(mix, tid)
                     elif not subcommand.soft_keyword:
-                        current_track.reset()
+                        current_track.reset(mix, tid)
 
                         return Rejected(
                             reason=LoopflowRejectReason.previous_option_unsatisfied,
@@ -202,14 +315,14 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
                     # NOTE: Option -> Option, should check if the current option is satisfied.
 
                     # NOTE: "_" is current option, reversed for the future.
-                    owner, keyword, _ = snapshot.option  # type: ignore
-                    current_track = mix.option_tracks[owner, keyword]
+                    tid = snapshot.option_id
+                    current_track = mix.tracks[tid]
 
-                    if current_track.satisfied:
-                        current_track.complete(mix)
+                    if mix.cursors[tid] >= current_track.required:
+                        current_track.complete(mix, tid)
                         snapshot.state = ProcessingState.COMMAND
                     elif not target_option.soft_keyword:
-                        current_track.reset()
+                        current_track.reset(mix, tid)
 
                         return Rejected(
                             reason=LoopflowRejectReason.previous_option_unsatisfied,
@@ -239,12 +352,15 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
                     continue
 
         if state is ProcessingState.COMMAND:
-            track = mix.command_tracks[tuple(snapshot.command)]
+            tid = snapshot.command_id
             separators = context.separators
 
             try:
-                hit_fragment = track.forward(mix, buffer, separators)
+                hit_fragment = mix.tracks[tid].forward(mix, tid, buffer, separators)
             except OutOfData:
+                if incremental:
+                    return Suspended(snapshot, buffer)
+
                 return Rejected(
                     reason=LoopflowRejectReason.expect_forward_subcommand,
                     exception=None,
@@ -272,18 +388,23 @@ def analyze_loopflow(snapshot: AnalyzeSnapshot, buffer: Buffer[T]) -> LoopflowRe
                         exception=None,
                         snapshot=snapshot,
                         buffer=buffer,
+                        segment=token.val,
                     )
         else:
-            owner, keyword, opt = snapshot.option  # type: ignore
-            track = mix.option_tracks[owner, keyword]  # type: ignore
+            opt = snapshot.option[2]  # type: ignore
+            tid = snapshot.option_id
+            track = mix.tracks[tid]
             separators = opt.separators
 
             try:
-                hit_fragment = track.forward(mix, buffer, separators)
+                hit_fragment = track.forward(mix, tid, buffer, separators)
             except OutOfData:
+                if incremental:
+                    return Suspended(snapshot, buffer)
+
                 # NOTE: For option fragments, "prompt" is unavailable so consumed data won't back.
                 #       (Sistana cannot treat soft keyword consistently.)
-                track.reset()
+                track.reset(mix, tid)
 
                 return Rejected(
                     reason=LoopflowRejectReason.expect_forward_option,
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, TypeVar
+
+from elaina_segment import Buffer
+
+from .analyzer import Accepted, LoopflowRejectReason, Rejected, analyze_loopflow
+from .err import TransformPanic, ValidateRejected
+from .model.compiled import CompiledPattern
+from .model.pattern import SubcommandPattern
+from .model.snapshot import ProcessingState, SnapshotPool
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+    from .analyzer import LoopflowResult
+    from .model.fragment import Fragment
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class AnalyzeSummary:
+    """A picklable digest of a loopflow result, used to bring results back from worker processes."""
+
+    reason: LoopflowRejectReason | None
+    exception: BaseException | None
+    endpoint: tuple[str, ...] | None
+    assignes: dict[str, Any]
+
+    @property
+    def accepted(self):
+        return self.reason is None
+
+
+def summarize(response: LoopflowResult[Any]) -> AnalyzeSummary:
+    snapshot = response.snapshot
+
+    if isinstance(response, Accepted):
+        return AnalyzeSummary(None, None, snapshot.endpoint, dict(snapshot.mix.assignes))
+
+    return AnalyzeSummary(response.reason, response.exception, snapshot.endpoint, dict(snapshot.mix.assignes))
+
+
+def _compile(pattern: SubcommandPattern | CompiledPattern | Callable[[], SubcommandPattern]):
+    if isinstance(pattern, CompiledPattern):
+        return pattern
+
+    if not isinstance(pattern, SubcommandPattern):
+        pattern = pattern()
+
+    return pattern.compile()
+
+
+def _analyze_serial(
+    compiled: CompiledPattern,
+    buffers: Iterable[Buffer[T]],
+    state: ProcessingState,
+    *,
+    recycle: bool,
+) -> Iterator[LoopflowResult[T]]:
+    loopflow = analyze_loopflow
+
+    if not recycle:
+        create_snapshot = compiled.create_snapshot
+
+        for buffer in buffers:
+            yield loopflow(create_snapshot(state), buffer)
+
+        return
+
+    pool = SnapshotPool(compiled, maxsize=1)
+    acquire = pool.acquire
+    release = pool.release
+
+    for buffer in buffers:
+        snapshot = acquire(state)
+
+        try:
+            yield loopflow(snapshot, buffer)
+        finally:
+            # NOTE: the snapshot is reset once the consumer asks for the next result.
+            release(snapshot)
+
+
+def settle_deferred(responses: list[LoopflowResult[T]]) -> list[LoopflowResult[T]]:
+    """Run the deferred batch validators and transformers over the results of a batch analysis, column by column.
+
+    An accepted result with a value refused by a batch validator becomes a `component_rejected` one,
+    like it would be in a single analysis. A failing batch transformer raises `TransformPanic`.
+    """
+
+    columns: dict[int, tuple[Fragment, list[int], list[Any]]] = {}
+
+    for row, response in enumerate(responses):
+        mix = response.snapshot.mix
+
+        if not mix.deferred:
+            continue
+
+        for name, frag in mix.deferred.items():
+            column = columns.get(id(frag))
+            if column is None:
+                column = columns[id(frag)] = (frag, [], [])
+
+            column[1].append(row)
+            column[2].append(mix.assignes[name])
+
+        mix.deferred.clear()
+
+    responses = list(responses)
+
+    for frag, rows, values in columns.values():
+        if frag.batch_validator is not None:
+            passed = []
+
+            for row, val, ok in zip(rows, values, frag.batch_validator(values), strict=True):
+                if ok:
+                    passed.append((row, val))
+                    continue
+
+                response = responses[row]
+                if isinstance(response, Accepted):
+                    responses[row] = Rejected(
+                        reason=LoopflowRejectReason.component_rejected,
+                        exception=ValidateRejected(f"Validation failed for {frag.name}, got {val}"),
+                        snapshot=response.snapshot,
+                        buffer=response.buffer,
+                    )
+
+            rows = [row for row, _ in passed]
+            values = [val for _, val in passed]
+
+        if frag.batch_transformer is not None and values:
+            try:
+                transformed = list(frag.batch_transformer(values))
+            except Exception as e:
+                raise TransformPanic(f"Failed to transform {frag.name} via {frag.batch_transformer}, got {len(values)} values") from e
+
+            for row, val in zip(rows, transformed, strict=True):
+                responses[row].snapshot.mix.assignes[frag.name] = val
+
+    return responses
+
+
+def _analyze_deferred(
+    compiled: CompiledPattern,
+    buffers: Iterable[Buffer[T]],
+    state: ProcessingState,
+    window: int,
+) -> Iterator[LoopflowResult[T]]:
+    loopflow = analyze_loopflow
+    create_snapshot = compiled.create_snapshot
+    iterator = iter(buffers)
+
+    while chunk := list(islice(iterator, window)):
+        responses = []
+
+        for buffer in chunk:
+            snapshot = create_snapshot(state)
+            snapshot.mix.deferred = {}
+            responses.append(loopflow(snapshot, buffer))
+
+        yield from settle_deferred(responses)
+
+
+# NOTE: worker side cache, patterns built by a factory are compiled once per process.
+_worker_patterns: dict[Any, CompiledPattern] = {}
+
+
+def _analyze_chunk(
+    pattern: SubcommandPattern | CompiledPattern | Callable[[], SubcommandPattern],
+    chunk: list[list[Any]],
+    state: ProcessingState,
+    reducer: Callable[[LoopflowResult[Any]], R],
+    *,
+    deferred: bool,
+) -> list[R]:
+    if isinstance(pattern, (SubcommandPattern, CompiledPattern)):
+        compiled = _compile(pattern)
+    else:
+        compiled = _worker_patterns.get(pattern)
+
+        if compiled is None:
+            compiled = _worker_patterns[pattern] = _compile(pattern)
+
+    if deferred:
+        responses = _analyze_deferred(compiled, map(Buffer, chunk), state, len(chunk))
+    else:
+        responses = _analyze_serial(compiled, map(Buffer, chunk), state, recycle=False)
+
+    return [reducer(response) for response in responses]
+
+
+def _analyze_parallel(
+    pattern: SubcommandPattern | CompiledPattern | Callable[[], SubcommandPattern],
+    inputs: Iterable[list[Any]],
+    state: ProcessingState,
+    reducer: Callable[[LoopflowResult[Any]], R],
+    *,
+    executor: Executor,
+    chunksize: int,
+    prefetch: int,
+    deferred: bool,
+) -> Iterator[R]:
+    iterator = iter(inputs)
+    pending: deque[Future[list[R]]] = deque()
+
+    def submit():
+        chunk = list(islice(iterator, chunksize))
+        if chunk:
+            pending.append(executor.submit(_analyze_chunk, pattern, chunk, state, reducer, deferred=deferred))
+
+        return bool(chunk)
+
+    while len(pending) < prefetch and submit():
+        pass
+
+    while pending:
+        results = pending.popleft().result()
+        submit()
+
+        yield from results
+
+
+def analyze_many(
+    pattern: SubcommandPattern | CompiledPattern | Callable[[], SubcommandPattern],
+    buffers: Iterable[Any],
+    state: ProcessingState = ProcessingState.PREFIX,
+    *,
+    recycle: bool = False,
+    deferred: bool = False,
+    executor: Executor | None = None,
+    reducer: Callable[[LoopflowResult[Any]], Any] | None = None,
+    chunksize: int = 512,
+    prefetch: int = 8,
+) -> Iterator[Any]:
+    """Analyze a stream of inputs against one pattern, results are yielded in input order.
+
+    The pattern is compiled once, and the lookup tables are shared by every input.
+    With `recycle`, a single snapshot is reset and reused for every input: a result is only valid
+    until the next one is requested.
+
+    With `executor` (usually a `ProcessPoolExecutor`), inputs are split into chunks of `chunksize`
+    and analyzed by the workers. Buffers cannot cross process boundaries, so the inputs are raw data
+    (`list[str | T]`, which is what `Buffer` is built from), and each result is passed through `reducer`
+    (defaults to `summarize`) inside the worker before sent back. The pattern is pickled for every chunk,
+    pass a picklable factory (e.g. `SomeCommand.get_command_pattern`) to build it once per worker instead.
+
+    With `deferred`, the batch validators and transformers of fragments (`Fragment.batch_validator` and
+    `Fragment.batch_transformer`) are not called for each input, but once per fragment over windows of `chunksize`
+    inputs, see `settle_deferred`. Results are then yielded window by window. It cannot be used with `recycle`.
+    """
+
+    if deferred and recycle:
+        raise ValueError("deferred analysis keeps a window of results alive, which cannot be recycled.")
+
+    if executor is not None:
+        return _analyze_parallel(
+            pattern,
+            buffers,
+            state,
+            reducer or summarize,
+            executor=executor,
+            chunksize=chunksize,
+            prefetch=prefetch,
+            deferred=deferred,
+        )
+
+    if deferred:
+        results = _analyze_deferred(_compile(pattern), buffers, state, chunksize)
+    else:
+        results = _analyze_serial(_compile(pattern), buffers, state, recycle=recycle)
+
+    if reducer is not None:
+        return map(reducer, results)
+
+    return results
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Literal, overload
+
+from elaina_segment.err import OutOfData
+
+from .analyzer import Accepted, LoopflowRejectReason, Rejected, Suspended, analyze_loopflow
+from .err import ParsePanic, ParseRejected
+from .model.compiled import CompiledPattern, CompiledSnapshot, PathTable
+from .model.snapshot import AnalyzeSnapshot, ProcessingState
+
+if TYPE_CHECKING:
+    from elaina_segment import Buffer
+
+    from .analyzer import LoopflowResult
+    from .model.pattern import SubcommandPattern
+
+PathFunction = Callable[[CompiledSnapshot, "Buffer[Any]", bool], "LoopflowResult[Any] | Suspended[Any] | None"]
+
+
+class _Emitter:
+    __slots__ = ("lines",)
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def __call__(self, indent: int, source: str):
+        for line in source.strip("\n").splitlines():
+            self.lines.append("    " * indent + line if line else "")
+
+    def blank(self):
+        self.lines.append("")
+
+    @property
+    def source(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def _reject(reason: LoopflowRejectReason, exception: str = "None", segment: str | None = None):
+    if segment is not None:
+        return f"return Rejected(REASON_{reason.name}, {exception}, snapshot, buffer, {segment})"
+
+    return f"return Rejected(REASON_{reason.name}, {exception}, snapshot, buffer)"
+
+
+def _emit_out_of_data(emit: _Emitter):
+    emit(
+        2,
+        f"""
+try:
+    token = buffer.next(SEPARATORS)
+except OutOfData:
+    if incremental:
+        return Suspended(snapshot, buffer)
+
+    if mix.unsatisfied == 0:
+        mix.complete()
+        snapshot.determine()
+        return Accepted(snapshot, buffer)
+
+    if state is OPTION:
+        tid = snapshot.option_id
+        tracks[tid].reset(mix, tid)
+
+    {_reject(LoopflowRejectReason.unsatisfied)}
+""",
+    )
+
+
+def _emit_entrance(emit: _Emitter, pattern: SubcommandPattern):
+    # NOTE: only the root path could start in PREFIX or HEADER state.
+    if pattern.prefixes is not None:
+        emit(
+            2,
+            f"""
+if state is PREFIX:
+    if not isinstance(val, str):
+        {_reject(LoopflowRejectReason.prefix_expect_str)}
+
+    prefix = PREFIXES.longest_prefix_key(buffer.first())
+    if prefix is None:
+        {_reject(LoopflowRejectReason.prefix_mismatch)}
+
+    token.apply()
+    buffer.pushleft(val[len(prefix) :])
+    snapshot.state = HEADER
+    continue
+""",
+        )
+    else:
+        emit(
+            2,
+            """
+if state is PREFIX:
+    snapshot.state = HEADER
+    continue
+""",
+        )
+
+    emit.blank()
+
+    compact = ""
+    if pattern.compact_header:
+        compact = """
+    elif val.startswith(HEADER_KEYWORD):
+        tail = val[HEADER_LENGTH:]
+        if tail:
+            buffer.pushleft(tail)"""
+
+    emit(
+        2,
+        f"""
+if state is HEADER:
+    if not isinstance(val, str):
+        {_reject(LoopflowRejectReason.header_expect_str)}
+
+    token.apply()
+
+    if val == HEADER_KEYWORD or val in ALIASES:
+        pass{compact}
+    else:
+        {_reject(LoopflowRejectReason.header_mismatch, segment="val")}
+
+    command_track.emit_header(mix, cid, val)
+    snapshot.state = COMMAND
+    continue
+""",
+    )
+
+
+def _emit_previous_option(emit: _Emitter, indent: int, soft_keyword: str, *, exit_option: bool):
+    exit_state = "\n        snapshot.state = COMMAND" if exit_option else ""
+
+    emit(
+        indent,
+        f"""
+if state is OPTION:
+    tid = snapshot.option_id
+    current_track = tracks[tid]
+
+    if cursors[tid] >= current_track.required:
+        current_track.complete(mix, tid){exit_state}
+    elif not {soft_keyword}:
+        current_track.reset(mix, tid)
+        {_reject(LoopflowRejectReason.previous_option_unsatisfied)}
+    else:
+        enter_forward = True
+""",
+    )
+
+
+def _emit_keywords(emit: _Emitter, table: PathTable):
+    emit(2, "if isinstance(val, str):")
+
+    branch = "if"
+
+    if table.subcommands:
+        if table.compact_subcommands:
+            emit(
+                3,
+                """
+if (subcommand_info := get_subcommand(val)) is not None:
+    subcommand, tail = subcommand_info
+""",
+            )
+        else:
+            emit(
+                3,
+                """
+if (subcommand := SUBCOMMANDS.get(val)) is not None:
+    tail = None
+""",
+            )
+
+        emit(4, "enter_forward = False")
+        _emit_previous_option(emit, 4, "subcommand.soft_keyword", exit_option=False)
+        emit(
+            4,
+            f"""
+if not enter_forward:
+    if (mix.stage_unsatisfied == 0 and cursors[cid] >= COMMAND_REQUIRED) or subcommand.enter_instantly:
+        token.apply()
+        mix.complete()
+
+        if tail is not None:
+            buffer.pushleft(tail)
+
+        snapshot.enter_subcommand(val, subcommand)
+        return None
+
+    if not subcommand.soft_keyword:
+        {_reject(LoopflowRejectReason.previous_subcommand_unsatisfied)}
+""",
+        )
+        branch = "elif"
+
+    if not table.option_entries:
+        return
+
+    if not table.compact_options and not table.separated_options:
+        emit(
+            3,
+            f"""
+{branch} (option_info := EXACT_OPTIONS.get(val)) is not None:
+    target_option, target_owner = option_info
+    tail = None
+""",
+        )
+    else:
+        emit(
+            3,
+            f"""
+{branch} (option_info := get_option(val)) is not None:
+    target_option, target_owner, tail = option_info
+""",
+        )
+
+    emit(4, "enter_forward = False")
+    _emit_previous_option(emit, 4, "target_option.soft_keyword", exit_option=True)
+    emit(
+        4,
+        f"""
+if not enter_forward and (not target_option.soft_keyword or (mix.stage_unsatisfied == 0 and cursors[cid] >= COMMAND_REQUIRED)):
+    if not snapshot.enter_option(val, target_owner, target_option.keyword, target_option):
+        {_reject(LoopflowRejectReason.option_duplicated_prohibited)}
+
+    token.apply()
+
+    if tail is not None:
+        buffer.pushleft(tail)
+
+    continue
+""",
+    )
+
+
+def _emit_forward(emit: _Emitter, table: PathTable):
+    failures = f"""
+except ParsePanic:
+    raise
+except ParseRejected as e:
+    {_reject(LoopflowRejectReason.component_rejected, "e")}
+except Exception as e:
+    raise ParsePanic("Unexpected error occurred during sistana parsing") from e
+"""
+
+    if table.pattern.preset.subcommand_track.fragments:
+        command_forward = f"""
+try:
+    hit_fragment = command_track.forward(mix, cid, buffer, SEPARATORS)
+except OutOfData:
+    if incremental:
+        return Suspended(snapshot, buffer)
+
+    {_reject(LoopflowRejectReason.expect_forward_subcommand)}
+{failures.strip()}
+
+if hit_fragment is None:
+    {_reject(LoopflowRejectReason.unexpected_segment, segment="val")}
+"""
+    else:
+        # NOTE: nothing to assign on the command track, any other segment is unexpected.
+        command_forward = _reject(LoopflowRejectReason.unexpected_segment, segment="val")
+
+    emit(2, "if state is COMMAND:")
+    emit(3, command_forward)
+
+    if not table.option_entries:
+        return
+
+    emit(
+        2,
+        f"""
+else:
+    tid = snapshot.option_id
+    track = tracks[tid]
+
+    try:
+        hit_fragment = track.forward(mix, tid, buffer, snapshot.option[2].separators)
+    except OutOfData:
+        if incremental:
+            return Suspended(snapshot, buffer)
+
+        track.reset(mix, tid)
+        {_reject(LoopflowRejectReason.expect_forward_option)}
+    {failures.strip().replace(chr(10), chr(10) + "    ")}
+
+    if hit_fragment is None:
+        snapshot.state = COMMAND
+        buffer.add_to_ahead(val)
+        token.apply()
+""",
+    )
+
+
+def generate_source(table: PathTable, *, root: bool) -> str:
+    """Generate the source of a parse function specialized for one command path.
+
+    The function runs the loopflow state machine for its path only, and returns `None` after entering a subcommand,
+    so the caller dispatches to the function of the new path.
+    """
+
+    emit = _Emitter()
+    emit(
+        0,
+        """
+def parse(snapshot, buffer, incremental):
+    mix = snapshot.mix
+    tracks = mix.tracks
+    cursors = mix.cursors
+    cid = snapshot.command_id
+    command_track = tracks[cid]
+
+    while True:
+        state = snapshot.state
+""",
+    )
+    _emit_out_of_data(emit)
+    emit.blank()
+    emit(2, "val = token.val")
+    emit.blank()
+
+    if root:
+        _emit_entrance(emit, table.pattern)
+        emit.blank()
+
+    if table.subcommands or table.option_entries:
+        _emit_keywords(emit, table)
+        emit.blank()
+
+    _emit_forward(emit, table)
+
+    return emit.source
+
+
+def _namespace(table: PathTable) -> dict[str, Any]:
+    pattern = table.pattern
+    namespace: dict[str, Any] = {
+        "OutOfData": OutOfData,
+        "ParsePanic": ParsePanic,
+        "ParseRejected": ParseRejected,
+        "Accepted": Accepted,
+        "Rejected": Rejected,
+        "Suspended": Suspended,
+        "COMMAND": ProcessingState.COMMAND,
+        "PREFIX": ProcessingState.PREFIX,
+        "HEADER": ProcessingState.HEADER,
+        "OPTION": ProcessingState.OPTION,
+        "SEPARATORS": pattern.separators,
+        "COMMAND_REQUIRED": pattern.preset.subcommand_track.required,
+        "HEADER_KEYWORD": pattern.header,
+        "HEADER_LENGTH": len(pattern.header),
+        "ALIASES": frozenset(pattern.aliases),
+        "PREFIXES": pattern.prefixes,
+        "SUBCOMMANDS": table.subcommands,
+        "EXACT_OPTIONS": {trigger: table.option_entries[rank] for trigger, rank in table.exact_options.items()},
+        "get_subcommand": table.get_subcommand,
+        "get_option": table.get_option,
+    }
+
+    for reason in LoopflowRejectReason:
+        namespace[f"REASON_{reason.name}"] = reason
+
+    return namespace
+
+
+class GeneratedParser:
+    """An opt-in parser engine, with per-path parse functions generated from a compiled pattern.
+
+    It keeps the contract of `analyze_loopflow` (and works on the same snapshots), but every path has its own
+    function with the separators, lookup tables and track requirements inlined, so generic branches
+    that could never be taken on this path are gone.
+    Functions are generated and `exec`'d on the first visit of each path, see `sources` for the generated code.
+    """
+
+    __slots__ = ("compiled", "functions", "sources")
+
+    compiled: CompiledPattern
+    functions: dict[int, PathFunction]
+    sources: dict[tuple[str, ...], str]
+
+    def __init__(self, pattern: SubcommandPattern | CompiledPattern):
+        self.compiled = pattern if isinstance(pattern, CompiledPattern) else pattern.compile()
+        self.functions = {}
+        self.sources = {}
+
+    def function_of(self, table: PathTable) -> PathFunction:
+        function = self.functions.get(id(table))
+
+        if function is None:
+            source = self.sources[table.owner] = generate_source(table, root=table is self.compiled.root)
+            namespace = _namespace(table)
+            exec(compile(source, f"<sistana codegen {'.'.join(table.owner)}>", "exec"), namespace)  # noqa: S102
+            function = self.functions[id(table)] = namespace["parse"]
+
+        return function
+
+    def create_snapshot(self, state: ProcessingState = ProcessingState.COMMAND):
+        return self.compiled.create_snapshot(state)
+
+    @property
+    def root_entrypoint(self):
+        return self.create_snapshot()
+
+    @property
+    def prefix_entrypoint(self):
+        return self.create_snapshot(ProcessingState.PREFIX)
+
+    @property
+    def header_entrypoint(self):
+        return self.create_snapshot(ProcessingState.HEADER)
+
+    @overload
+    def analyze(
+        self, snapshot: AnalyzeSnapshot, buffer: Buffer[Any], *, incremental: Literal[False] = False
+    ) -> LoopflowResult[Any]: ...
+
+    @overload
+    def analyze(
+        self, snapshot: AnalyzeSnapshot, buffer: Buffer[Any], *, incremental: bool
+    ) -> LoopflowResult[Any] | Suspended[Any]: ...
+
+    def analyze(
+        self, snapshot: AnalyzeSnapshot, buffer: Buffer[Any], *, incremental: bool = False
+    ) -> LoopflowResult[Any] | Suspended[Any]:
+        if not isinstance(snapshot, CompiledSnapshot) or snapshot.root_table is not self.compiled.root:
+            # NOTE: snapshots from elsewhere have no generated functions, leave them to the generic engine.
+            return analyze_loopflow(snapshot, buffer, incremental=incremental)
+
+        while True:
+            response = self.function_of(snapshot.table)(snapshot, buffer, incremental)
+
+            if response is not None:
+                return response
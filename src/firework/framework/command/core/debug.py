@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from collections import deque
+from contextvars import ContextVar
+from itertools import count
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, TypeAlias
 
 if TYPE_CHECKING:
     from .model.fragment import Fragment
     from .model.mix import Preset, Track
     from .model.pattern import SubcommandPattern
+    from .model.snapshot import AnalyzeSnapshot, ProcessingState
 
 # TODO: Better pretty print
 
@@ -49,3 +53,100 @@ def pretty_preset_options(preset: Preset):
 
 def pretty_pattern(command: SubcommandPattern):
     return f"{command.header} <: {pretty_track(command.preset.subcommand_track)}\n{pretty_preset_options(command.preset)}"
+
+
+TRACE_BEGIN = 0
+TRACE_TOKEN = 1
+TRACE_CAPTURE = 2
+TRACE_END = 3
+TRACE_ENTER = 4
+
+# NOTE: (parse, kind, state, a, b), `a` and `b` depend on the kind:
+#       begin: command path, None / token: segment, None / capture: fragment name, value / end: command path, outcome /
+#       enter: command path of the subcommand entered, None.
+TraceEvent: TypeAlias = "tuple[int, int, ProcessingState, Any, Any]"
+
+
+class TraceRecorder:
+    """Records the tokens and captures of the latest analyses into a ring buffer, to look into odd rejects afterwards.
+
+    Set it to `TRACE_RECORDER` to enable, for the current context only (so each worker keeps its own recorder).
+    Events are compact tuples referencing the values as is, nothing is formatted until `dump`.
+    Once `capacity` events are kept the oldest ones are dropped, the earliest parse of a dump may be truncated.
+    """
+
+    __slots__ = ("counter", "events")
+
+    events: deque[TraceEvent]
+    counter: Iterator[int]
+
+    def __init__(self, capacity: int = 4096):
+        self.events = deque(maxlen=capacity)
+        self.counter = count()
+
+    def begin(self, snapshot: AnalyzeSnapshot) -> int:
+        parse = next(self.counter)
+        self.events.append((parse, TRACE_BEGIN, snapshot.state, tuple(snapshot.command), None))
+        return parse
+
+    def end(self, parse: int, snapshot: AnalyzeSnapshot, outcome: Any):
+        self.events.append((parse, TRACE_END, snapshot.state, tuple(snapshot.command), outcome))
+
+    def clear(self):
+        self.events.clear()
+
+    def parses(self, last: int | None = None) -> list[list[TraceEvent]]:
+        """Group the kept events by parse, oldest first, only the `last` parses if given."""
+
+        grouped: dict[int, list[TraceEvent]] = {}
+
+        for event in list(self.events):
+            grouped.setdefault(event[0], []).append(event)
+
+        traces = list(grouped.values())
+        return traces if last is None else traces[-last:] if last > 0 else []
+
+    def dump(self, last: int | None = None) -> list[str]:
+        return [pretty_trace(events) for events in self.parses(last)]
+
+
+TRACE_RECORDER: ContextVar[TraceRecorder | None] = ContextVar("SISTANA_TRACE_RECORDER", default=None)
+
+
+def _pretty_outcome(outcome: Any):
+    if isinstance(outcome, BaseException):
+        return f"panicked: {outcome!r}"
+
+    if outcome in {"accepted", "suspended"}:
+        return outcome
+
+    return f"rejected: {outcome}"
+
+
+def pretty_trace(events: Iterable[TraceEvent]):
+    lines = []
+    state = None
+
+    for parse, kind, current, a, b in events:
+        if kind == TRACE_BEGIN:
+            lines.append(f"#{parse} {' '.join(a)} [{current.name.lower()}]")
+            state = current
+            continue
+
+        if not lines:
+            lines.append(f"#{parse} (truncated)")
+        elif state is not None and current is not state:
+            lines.append(f"  state {state.name.lower()} -> {current.name.lower()}")
+
+        state = current
+
+        if kind == TRACE_TOKEN:
+            lines.append(f"  token {a!r}")
+        elif kind == TRACE_CAPTURE:
+            lines.append(f"  capture {a} = {b!r}")
+        elif kind == TRACE_ENTER:
+            lines.append(f"  enter {' '.join(a)}")
+        else:
+            lines.append(f"  {_pretty_outcome(b)} at {' '.join(a)}")
+
+    return "\n".join(lines)
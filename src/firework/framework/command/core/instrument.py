@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable, Generic, TypeVar
+
+from elaina_segment import SEPARATORS
+
+from .debug import TRACE_CAPTURE, TRACE_ENTER, TRACE_TOKEN
+from .model.mix import Track
+
+if TYPE_CHECKING:
+    from elaina_segment import AheadToken, Buffer, Segment, SegmentToken
+
+    from .analyzer import LoopflowRejectReason
+    from .debug import TraceRecorder
+    from .model.fragment import Fragment
+    from .model.mix import Mix
+    from .model.pattern import SubcommandPattern
+    from .model.snapshot import AnalyzeSnapshot
+
+T = TypeVar("T")
+
+
+class PatternStats:
+    """Counters of the analyses of one root pattern which ended on one command path."""
+
+    __slots__ = ("accepts", "elapsed", "fragments", "panics", "parses", "path", "pattern", "rejects", "suspends", "tokens")
+
+    pattern: SubcommandPattern
+    path: tuple[str, ...]
+    parses: int
+    accepts: int
+    rejects: dict[LoopflowRejectReason, int]
+    suspends: int
+    panics: int
+    tokens: int
+    fragments: int
+    elapsed: int  # nanoseconds
+
+    def __init__(self, pattern: SubcommandPattern, path: tuple[str, ...]):
+        self.pattern = pattern
+        self.path = path
+        self.parses = 0
+        self.accepts = 0
+        self.rejects = {}
+        self.suspends = 0
+        self.panics = 0
+        self.tokens = 0
+        self.fragments = 0
+        self.elapsed = 0
+
+    def __repr__(self):
+        return (
+            f"PatternStats(path={self.path}, parses={self.parses}, accepts={self.accepts}, rejects={self.rejects}, suspends={self.suspends}, "
+            f"panics={self.panics}, tokens={self.tokens}, fragments={self.fragments}, elapsed={self.elapsed})"
+        )
+
+
+class Instrumentation:
+    """Collects `PatternStats` of `analyze_loopflow` per root pattern and command path (where the analysis ended).
+
+    Root patterns are told apart by identity, so patterns sharing a header (e.g. in a `CommandRouter`) are counted apart.
+
+    Set it to `INSTRUMENTATION` to enable, for the current context only. When unset (along with `TRACE_RECORDER`),
+    the analyzer pays two context variable lookups per call. Tokens are the segments consumed from the buffer, fragments are the values
+    captured from the input (defaults are not counted). Analyses run by `GeneratedParser` are not instrumented.
+    """
+
+    __slots__ = ("stats",)
+
+    # NOTE: keyed by (id of the root pattern, command path), the stats keep the root pattern alive.
+    stats: dict[tuple[int, tuple[str, ...]], PatternStats]
+
+    def __init__(self):
+        self.stats = {}
+
+    def _stats_of(self, snapshot: AnalyzeSnapshot):
+        path = tuple(snapshot.command)
+        pattern = snapshot.traverses[path[:1]]
+        key = id(pattern), path
+        stats = self.stats.get(key)
+
+        if stats is None:
+            stats = self.stats[key] = PatternStats(pattern, path)
+
+        return stats
+
+    def record(self, snapshot: AnalyzeSnapshot, probe: Probe[Any], reason: LoopflowRejectReason | None, *, suspended: bool = False):
+        stats = self._stats_of(snapshot)
+        stats.parses += 1
+        stats.tokens += probe.tokens
+        stats.fragments += probe.fragments
+        stats.elapsed += probe.elapsed
+
+        if suspended:
+            stats.suspends += 1
+        elif reason is None:
+            stats.accepts += 1
+        else:
+            stats.rejects[reason] = stats.rejects.get(reason, 0) + 1
+
+    def record_panic(self, snapshot: AnalyzeSnapshot, probe: Probe[Any]):
+        stats = self._stats_of(snapshot)
+        stats.parses += 1
+        stats.panics += 1
+        stats.elapsed += probe.elapsed
+
+    def export(self, sink: Callable[[SubcommandPattern, tuple[str, ...], PatternStats], Any], *, reset: bool = True):
+        """Pass the stats of every root pattern and command path to `sink` (e.g. to forward them to a metrics backend)."""
+
+        stats = list(self.stats.values())
+
+        if reset:
+            self.stats = {}
+
+        for item in stats:
+            sink(item.pattern, item.path, item)
+
+
+INSTRUMENTATION: ContextVar[Instrumentation | None] = ContextVar("SISTANA_INSTRUMENTATION", default=None)
+
+
+class ProbeToken(Generic[T]):
+    __slots__ = ("probe", "token", "val")
+
+    probe: Probe[T]
+    token: SegmentToken[T] | AheadToken[T]
+    val: Segment[T]
+
+    def __init__(self, probe: Probe[T], token: SegmentToken[T] | AheadToken[T]):
+        self.probe = probe
+        self.token = token
+        self.val = token.val
+
+    def apply(self):
+        probe = self.probe
+        probe.tokens += 1
+
+        if probe.recorder is not None:
+            probe.recorder.events.append((probe.parse, TRACE_TOKEN, probe.snapshot.state, self.val, None))
+
+        self.token.apply()
+
+
+class ProbeTrack(Track):
+    """A track counting (and tracing) the fragments it captures, installed into the mix only while a probe is running."""
+
+    __slots__ = ("origin", "probe")
+
+    origin: Track
+    probe: Probe[Any]
+
+    def __init__(self, origin: Track, probe: Probe[Any]):
+        self.fragments = origin.fragments
+        self.header = origin.header
+        self.max_length = origin.max_length
+        self.required = origin.required
+        self.forwarding = origin.forwarding
+        self.regex_runs = origin.regex_runs
+        self.origin = origin
+        self.probe = probe
+
+    def forward(self, mix: Mix, tid: int, buffer: Buffer, separators: str):
+        cursor = mix.cursors[tid]
+        hit = super().forward(mix, tid, buffer, separators)
+
+        if hit is not None:
+            # NOTE: a fused regex run moves the cursor by several fragments at once, a variadic one does not move it.
+            moved = mix.cursors[tid] - cursor
+            self.probe.fragments += max(moved, 1)
+
+            if self.probe.recorder is not None:
+                for frag in self.fragments[cursor : cursor + moved] if moved > 1 else (hit,):
+                    self.probe.capture(frag)
+
+        return hit
+
+    def emit_header(self, mix: Mix, tid: int, segment: str):
+        super().emit_header(mix, tid, segment)
+
+        if self.header is not None:
+            self.probe.fragments += 1
+
+            if self.probe.recorder is not None:
+                self.probe.capture(self.header)
+
+
+class ProbeTracks(list):
+    # NOTE: `Mix.update` extends the tracks when a subcommand is entered, those are probed as well.
+    __slots__ = ("probe",)
+
+    def __init__(self, tracks: list[Track], probe: Probe[Any]):
+        super().__init__(ProbeTrack(track, probe) for track in tracks)
+        self.probe = probe
+
+    def extend(self, tracks):
+        super().extend(ProbeTrack(track, self.probe) for track in tracks)
+
+        if self.probe.recorder is not None:
+            self.probe.enter()
+
+
+class Probe(Generic[T]):
+    """Measures one analysis: it stands in for the buffer, and for the tracks of the mix until `close`.
+
+    With a `recorder`, the tokens and captures are traced as well, `close` records the outcome.
+    """
+
+    __slots__ = ("buffer", "elapsed", "fragments", "mix", "parse", "recorder", "snapshot", "started", "tokens")
+
+    buffer: Buffer[T]
+    snapshot: AnalyzeSnapshot
+    mix: Mix
+    recorder: TraceRecorder | None
+    parse: int
+    tokens: int
+    fragments: int
+    started: int
+    elapsed: int
+
+    def __init__(self, snapshot: AnalyzeSnapshot, buffer: Buffer[T], recorder: TraceRecorder | None = None):
+        self.buffer = buffer
+        self.snapshot = snapshot
+        self.mix = snapshot.mix
+        self.recorder = recorder
+        self.parse = recorder.begin(snapshot) if recorder is not None else -1
+        self.tokens = 0
+        self.fragments = 0
+        self.elapsed = 0
+
+        self.mix.tracks = ProbeTracks(self.mix.tracks, self)
+        self.started = perf_counter_ns()
+
+    def capture(self, frag: Fragment):
+        value = self.mix.assignes.get(frag.name)
+
+        if frag.variadic and type(value) is list and value:
+            value = value[-1]
+
+        self.recorder.events.append((self.parse, TRACE_CAPTURE, self.snapshot.state, frag.name, value))  # type: ignore
+
+    def enter(self):
+        # NOTE: called once the path of the snapshot points to the subcommand.
+        snapshot = self.snapshot
+        self.recorder.events.append((self.parse, TRACE_ENTER, snapshot.state, snapshot.path, None))  # type: ignore
+
+    def close(self, outcome: Any = None):
+        self.elapsed = perf_counter_ns() - self.started
+        self.mix.tracks = [track.origin if isinstance(track, ProbeTrack) else track for track in self.mix.tracks]
+
+        if self.recorder is not None:
+            self.recorder.end(self.parse, self.snapshot, outcome)
+
+    # NOTE: the subset of the `Buffer` interface the analyzer relies on.
+
+    def next(self, until: str = SEPARATORS) -> ProbeToken[T]:
+        return ProbeToken(self, self.buffer.next(until))
+
+    def first(self) -> Segment[T]:
+        return self.buffer.first()
+
+    def pushleft(self, *segments: Segment[T]):
+        self.buffer.pushleft(*segments)
+
+    def add_to_ahead(self, val: Segment[T]):
+        self.buffer.add_to_ahead(val)
+
+    def copy(self):
+        return self.buffer.copy()
@@ -4,9 +4,13 @@ from .capture import ObjectCapture as ObjectCapture
 from .capture import PlainCapture as PlainCapture
 from .capture import RegexCapture as RegexCapture
 from .capture import SimpleCapture as SimpleCapture
+from .compiled import CompiledPattern as CompiledPattern
+from .compiled import CompiledSnapshot as CompiledSnapshot
+from .compiled import PathTable as PathTable
 from .mix import Mix as Mix
 from .mix import Preset as Preset
 from .mix import Track as Track
+from .mix import TrackView as TrackView
 from .pattern import OptionPattern as OptionPattern
 from .pattern import SubcommandPattern as SubcommandPattern
 from .receiver import AccumRx as AccumRx
@@ -18,3 +22,4 @@ from .receiver import RxPrev as RxPrev
 from .receiver import RxPut as RxPut
 from .snapshot import AnalyzeSnapshot as AnalyzeSnapshot
 from .snapshot import ProcessingState as ProcessingState
+from .snapshot import SnapshotPool as SnapshotPool
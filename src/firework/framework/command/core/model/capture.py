@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from elaina_segment import Quoted, UnmatchedQuoted
@@ -63,27 +63,44 @@ class PlainCapture(Capture[Plain]):
         raise UnexpectedType(str, type(token.val))
 
 
+def regex_subject(val: Any, *, match_quote: bool) -> str:
+    if isinstance(val, str):
+        return val
+
+    if isinstance(val, (Quoted, UnmatchedQuoted)) and match_quote:
+        if isinstance(val.ref, str):
+            return val.ref
+
+        if next((i for i in val.ref if not isinstance(i, str)), None) is None:
+            return "".join(val.ref)
+
+        raise UnexpectedType(str, type(next(i for i in val.ref if not isinstance(i, str))))
+
+    raise UnexpectedType(str, val)
+
+
 @dataclass(**safe_dcls_kw(eq=True, unsafe_hash=True, slots=True))
 class RegexCapture(Capture[re.Match[str]]):
+    """Matches the start of a segment, the rest of the segment is left for the next read.
+
+    With `fuse`, a run of adjacent fusible regex fragments on a track is matched at once by a single regex
+    (see `Track`), note the joint match may split the segment differently than matching one by one.
+    """
+
     pattern: str | re.Pattern[str]
     match_quote: bool = False
+    fuse: bool = False
+
+    compiled: re.Pattern[str] = field(init=False, repr=False, compare=False, hash=False)
+
+    def __post_init__(self):
+        self.compiled = re.compile(self.pattern)
 
     def capture(self, buffer: Buffer[Any], separators: str) -> CaptureResult[re.Match[str]]:
         token = buffer.next(separators)
+        val = regex_subject(token.val, match_quote=self.match_quote)
 
-        if isinstance(token.val, str):
-            val = token.val
-        elif isinstance(token.val, (Quoted, UnmatchedQuoted)) and self.match_quote:
-            if isinstance(token.val.ref, str):
-                val = token.val.ref
-            elif next((i for i in token.val.ref if not isinstance(i, str)), None) is None:
-                val = "".join(token.val.ref)
-            else:
-                raise UnexpectedType(str, type(next(i for i in token.val.ref if not isinstance(i, str))))
-        else:
-            raise UnexpectedType(str, token.val)
-
-        match = re.match(self.pattern, val)
+        match = self.compiled.match(val)
         if not match:
             raise RegexMismatch(self.pattern, val)
 
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+from firework.util import FrozenRadixTrie
+
+from .snapshot import AnalyzeSnapshot, ProcessingState
+
+if TYPE_CHECKING:
+    from .pattern import OptionPattern, SubcommandPattern
+
+
+def _compact_lengths(keywords: Iterable[str]):
+    return tuple(sorted({len(i) for i in keywords}, reverse=True))
+
+
+class PathTable:
+    """Frozen keyword lookup tables for one command path.
+
+    A path decides which options are available: every option of the current command,
+    and the forwarding options of each command on the way to it.
+    These options are flattened into a single rank order (owner first, then declaration order),
+    so resolving a keyword is a few dictionary probes instead of a scan over every option.
+    """
+
+    __slots__ = (
+        "children",
+        "compact_option_lengths",
+        "compact_options",
+        "compact_subcommand_lengths",
+        "compact_subcommands",
+        "exact_options",
+        "header_index",
+        "keyword_index",
+        "option_entries",
+        "owner",
+        "pattern",
+        "separated_options",
+        "separators",
+        "subcommands",
+    )
+
+    pattern: SubcommandPattern
+    owner: tuple[str, ...]
+    children: dict[int, PathTable]
+
+    subcommands: dict[str, SubcommandPattern]
+    compact_subcommands: frozenset[str]
+    compact_subcommand_lengths: tuple[int, ...]
+
+    option_entries: tuple[tuple[OptionPattern, tuple[str, ...]], ...]
+    exact_options: dict[str, int]
+    compact_options: dict[str, int]
+    compact_option_lengths: tuple[int, ...]
+    separators: tuple[str, ...]
+    separated_options: dict[tuple[str, str], int]
+
+    keyword_index: FrozenRadixTrie[str] | None
+    header_index: FrozenRadixTrie[str] | None
+
+    def __init__(
+        self,
+        pattern: SubcommandPattern,
+        owner: tuple[str, ...],
+        inherited: Iterable[tuple[OptionPattern, tuple[str, ...]]] = (),
+    ):
+        self.pattern = pattern
+        self.owner = owner
+        self.children = {}
+
+        self.subcommands = dict(pattern._subcommands)
+
+        if pattern._compact_keywords is not None:
+            self.compact_subcommands = frozenset(pattern._compact_keywords.keys())
+        else:
+            self.compact_subcommands = frozenset()
+
+        self.compact_subcommand_lengths = _compact_lengths(self.compact_subcommands)
+
+        self.option_entries = (*inherited, *((option, owner) for option in pattern._options))
+        self.exact_options = {}
+        self.compact_options = {}
+        self.separated_options = {}
+
+        separators: dict[str, None] = {}
+
+        for rank, (option, _) in enumerate(self.option_entries):
+            triggers = (option.keyword, *option.aliases)
+
+            if option.compact_header:
+                for trigger in triggers:
+                    self.compact_options.setdefault(trigger, rank)
+
+                # NOTE: compact triggers always win over the header separator split of the same option.
+                continue
+
+            for trigger in triggers:
+                self.exact_options.setdefault(trigger, rank)
+
+            if option.header_separators is not None:
+                separators[option.header_separators] = None
+
+                for trigger in triggers:
+                    self.separated_options.setdefault((option.header_separators, trigger), rank)
+
+        self.compact_option_lengths = _compact_lengths(self.compact_options)
+        self.separators = tuple(separators)
+
+        self.keyword_index = None
+        self.header_index = None
+
+    def child(self, pattern: SubcommandPattern) -> PathTable:
+        table = self.children.get(id(pattern))
+
+        if table is None:
+            inherited = [(option, owner) for option, owner in self.option_entries if option.forwarding]
+            table = self.children[id(pattern)] = PathTable(pattern, (*self.owner, pattern.header), inherited)
+
+        return table
+
+    def keywords(self) -> FrozenRadixTrie[str]:
+        # NOTE: built on demand, only completion (and similar) needs the prefix enumeration.
+        if self.keyword_index is None:
+            self.keyword_index = FrozenRadixTrie.from_sorted(sorted({*self.subcommands, *self.exact_options, *self.compact_options}))
+
+        return self.keyword_index
+
+    def headers(self) -> FrozenRadixTrie[str]:
+        if self.header_index is None:
+            self.header_index = FrozenRadixTrie.from_sorted(sorted({self.pattern.header, *self.pattern.aliases}))
+
+        return self.header_index
+
+    def get_subcommand(self, val: str):
+        subcommand = self.subcommands.get(val)
+        if subcommand is not None:
+            return subcommand, None
+
+        val_length = len(val)
+
+        # NOTE: lengths are sorted in descending order, so the first hit is the longest prefix.
+        for length in self.compact_subcommand_lengths:
+            if length < val_length and (prefix := val[:length]) in self.compact_subcommands:
+                return self.subcommands[prefix], val[length:]
+
+    def get_option(self, val: str):
+        rank = self.exact_options.get(val)
+        tail = None
+
+        val_length = len(val)
+
+        for length in self.compact_option_lengths:
+            if length > val_length:
+                continue
+
+            compact_rank = self.compact_options.get(val[:length])
+            if compact_rank is not None and (rank is None or compact_rank < rank):
+                rank = compact_rank
+                tail = val[length:]
+
+        for separator in self.separators:
+            if separator not in val:
+                continue
+
+            keyword, separated_tail = val.split(separator, 1)
+            separated_rank = self.separated_options.get((separator, keyword))
+
+            if separated_rank is not None and (rank is None or separated_rank < rank):
+                rank = separated_rank
+                tail = separated_tail
+
+        if rank is not None:
+            option, owner = self.option_entries[rank]
+            return option, owner, tail
+
+
+def path_table(snapshot: AnalyzeSnapshot) -> PathTable:
+    if isinstance(snapshot, CompiledSnapshot):
+        return snapshot.table
+
+    # NOTE: slow path for plain snapshots, tables are rebuilt along the command path.
+    command = snapshot.command
+    table = PathTable(snapshot.traverses[command[0],], (command[0],))
+
+    for ix in range(2, len(command) + 1):
+        table = table.child(snapshot.traverses[tuple(command[:ix])])
+
+    return table
+
+
+class CompiledSnapshot(AnalyzeSnapshot):
+    __slots__ = ("root_table", "table")
+
+    root_table: PathTable
+    table: PathTable
+
+    def __init__(
+        self,
+        command: list[str],
+        traverses: dict[tuple[str, ...], SubcommandPattern],
+        table: PathTable,
+        state: ProcessingState = ProcessingState.COMMAND,
+    ):
+        super().__init__(command, traverses, state)
+        self.root_table = self.table = table
+
+    def reset(self, state: ProcessingState = ProcessingState.COMMAND):
+        super().reset(state)
+        self.table = self.root_table
+
+    def _clone_from(self, other: CompiledSnapshot):
+        super()._clone_from(other)
+        self.root_table = other.root_table
+        self.table = other.table
+
+    def enter_subcommand(self, trigger: str, pattern: SubcommandPattern):
+        self.table = self.table.child(pattern)
+        super().enter_subcommand(trigger, pattern)
+
+    def get_subcommand(self, val: str):
+        return self.table.get_subcommand(val)
+
+    def get_option(self, val: str):
+        return self.table.get_option(val)
+
+
+class CompiledPattern:
+    """A frozen view of a :class:`SubcommandPattern` tree.
+
+    Snapshots created from here resolve subcommands and options through per-path lookup tables,
+    the tables are built once on the first visit of each path and shared among all snapshots afterwards.
+    Changes made to the pattern tree after compiling are not visible, compile again if needed.
+    """
+
+    __slots__ = ("pattern", "root")
+
+    pattern: SubcommandPattern
+    root: PathTable
+
+    def __init__(self, pattern: SubcommandPattern):
+        self.pattern = pattern
+        self.root = PathTable(pattern, (pattern.header,))
+
+    def create_snapshot(self, state: ProcessingState = ProcessingState.COMMAND):
+        pattern = self.pattern
+        return CompiledSnapshot(command=[pattern.header], traverses={(pattern.header,): pattern}, table=self.root, state=state)
+
+    @property
+    def root_entrypoint(self):
+        return self.create_snapshot()
+
+    @property
+    def prefix_entrypoint(self):
+        return self.create_snapshot(ProcessingState.PREFIX)
+
+    @property
+    def header_entrypoint(self):
+        return self.create_snapshot(ProcessingState.HEADER)
@@ -25,6 +25,12 @@ class Fragment:
     validator: Callable[[Any], bool] | None = None
     transformer: Callable[[Any], Any] | None = None
 
+    # NOTE: column-wise variants, run after `validator` and `transformer` on their output.
+    #       A single analysis calls them with one-item lists, batch analysis (see `analyze_many`) defers them
+    #       and calls them once over the values of many inputs.
+    batch_validator: Callable[[list[Any]], Iterable[bool]] | None = None
+    batch_transformer: Callable[[list[Any]], Iterable[Any]] | None = None
+
 
 @dataclass
 class FragmentGroup:
@@ -1,47 +1,181 @@
 from __future__ import annotations
 
+import asyncio
+import re
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, cast
+from inspect import isawaitable
+from typing import TYPE_CHECKING, Any, Awaitable, cast
 
 from firework.util import Maybe, Some
 
 from ..err import CaptureRejected, ReceivePanic, TransformPanic, ValidateRejected
+from .capture import RegexCapture, regex_subject
 from .fragment import Fragment, FragmentGroup, assert_fragments_order
+from .receiver import DIRECT_RECEIVERS, Rx
 
 if TYPE_CHECKING:
     from elaina_segment import Buffer
 
 
+def _required_length(fragments: tuple[Fragment, ...]):
+    # NOTE: fragments are ordered as (required..., optional..., variadic?), see `assert_fragments_order`.
+    for ix, frag in enumerate(fragments):
+        if frag.default is not None or frag.variadic:
+            return ix
+
+    return len(fragments)
+
+
+def batch_single(frag: Fragment, val: Any):
+    if frag.batch_validator is not None and not next(iter(frag.batch_validator([val]))):
+        raise ValidateRejected(f"Validation failed for {frag.name}, got {val}")
+
+    if frag.batch_transformer is not None:
+        try:
+            val = next(iter(frag.batch_transformer([val])))
+        except Exception as e:
+            raise TransformPanic(f"Failed to transform {frag.name} via {frag.batch_transformer}, got {val}") from e
+
+    return val
+
+
+def _discard(awaitable: Awaitable[Any]):
+    # NOTE: avoids the "never awaited" warning of coroutines.
+    close = getattr(awaitable, "close", None)
+    if close is not None:
+        close()
+
+
+def _check_pending(frag: Fragment, awaitable: Awaitable[Any]):
+    # NOTE: the value of an async transformer is a placeholder until resolved, so it must be assigned as is.
+    if type(frag.receiver) is not Rx or frag.batch_validator is not None or frag.batch_transformer is not None:
+        _discard(awaitable)
+        raise TransformPanic(f"Async transformer of {frag.name} only works with the plain receiver and no batch functions")
+
+    return awaitable
+
+
+def _fusible(frag: Fragment):
+    capture = frag.capture
+    return (
+        isinstance(capture, RegexCapture)
+        and capture.fuse
+        and type(frag.receiver) is Rx
+        and not frag.variadic
+        and frag.group is None
+        and frag.batch_validator is None
+        and frag.batch_transformer is None
+        # NOTE: inline flags cannot be carried into the joint pattern, neither can groups (and backreferences to them)
+        #       without shifting the group numbers of the fragments after.
+        and capture.compiled.flags == re.UNICODE
+        and capture.compiled.groups == 0
+    )
+
+
+class RegexRun:
+    """Adjacent fusible regex fragments of a track, matched at once by a joint pattern with one group each."""
+
+    __slots__ = ("compiled", "fragments", "match_quote")
+
+    fragments: tuple[Fragment, ...]
+    compiled: re.Pattern[str]
+    match_quote: bool
+
+    def __init__(self, fragments: tuple[Fragment, ...], compiled: re.Pattern[str], *, match_quote: bool):
+        self.fragments = fragments
+        self.compiled = compiled
+        self.match_quote = match_quote
+
+    @classmethod
+    def build(cls, fragments: tuple[Fragment, ...]):
+        captures = [cast("RegexCapture", frag.capture) for frag in fragments]
+        pattern = "".join(f"(?P<_fuse{ix}>{capture.compiled.pattern})" for ix, capture in enumerate(captures))
+
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            # NOTE: e.g. the same group name is used by two fragments, those are matched one by one then.
+            return None
+
+        return cls(fragments, compiled, match_quote=captures[0].match_quote)
+
+
+def _regex_runs(fragments: tuple[Fragment, ...]):
+    runs: dict[int, RegexRun] = {}
+    start = 0
+
+    while start < len(fragments):
+        if not _fusible(fragments[start]):
+            start += 1
+            continue
+
+        first = fragments[start]
+        end = start + 1
+
+        while (
+            end < len(fragments)
+            and _fusible(fragments[end])
+            and fragments[end].separators == first.separators
+            and fragments[end].hybrid_separators == first.hybrid_separators
+            and cast("RegexCapture", fragments[end].capture).match_quote == cast("RegexCapture", first.capture).match_quote
+        ):
+            end += 1
+
+        if end - start > 1 and (run := RegexRun.build(fragments[start:end])) is not None:
+            runs[start] = run
+
+        start = end
+
+    return runs
+
+
 class Track:
-    __slots__ = ("cursor", "emitted", "fragments", "header", "max_length")
+    """The immutable layout of a track, shared by every analysis.
+
+    Per-analysis state (cursor and emitted flag) lives in the arrays of `Mix`, indexed by the track id
+    which is allocated when the owner command is entered, so methods here take both the mix and the id.
+    """
+
+    __slots__ = ("forwarding", "fragments", "header", "max_length", "regex_runs", "required")
 
     header: Fragment | None
     fragments: tuple[Fragment, ...]
-    cursor: int
     max_length: int
-    emitted: bool
+    required: int
+    forwarding: bool
+    regex_runs: dict[int, RegexRun]
 
-    def __init__(self, fragments: tuple[Fragment, ...], header: Fragment | None = None):
+    def __init__(self, fragments: tuple[Fragment, ...], header: Fragment | None = None, *, forwarding: bool = True):
         self.fragments = fragments
         self.header = header
-        self.cursor = 0
         self.max_length = len(self.fragments)
-        self.emitted = False
+        self.required = _required_length(fragments)
+        self.forwarding = forwarding
+        self.regex_runs = _regex_runs(fragments)
 
-    @property
-    def satisfied(self):
-        return (
-            self.cursor >= self.max_length or self.fragments[self.cursor].default is not None or self.fragments[self.cursor].variadic
-        )
+    def _settle(self, mix: Mix, *, was_satisfied: bool, now_satisfied: bool):
+        # NOTE: keeps the unsatisfied counters of Mix in sync, call it after the cursor moved.
+        if was_satisfied is now_satisfied:
+            return
 
-    def complete(self, mix: Mix):
+        delta = 1 if was_satisfied else -1
+        mix.unsatisfied += delta
+
+        if not self.forwarding:
+            mix.stage_unsatisfied += delta
+
+    def complete(self, mix: Mix, tid: int):
         if self.header is not None and self.header.name not in mix.assignes and self.header.default is not None:
             mix.assignes[self.header.name] = self.header.default.value
 
-        if self.cursor >= self.max_length:
+        cursor = mix.cursors[tid]
+
+        if cursor >= self.max_length:
             return
 
-        for frag in self.fragments[self.cursor :]:
+        was_satisfied = cursor >= self.required
+
+        for frag in self.fragments[cursor:]:
             if frag.name not in mix.assignes:
                 if frag.default is not None:
                     mix.assignes[frag.name] = frag.default.value
@@ -50,18 +184,94 @@ class Track:
 
             # NOTE: keep consistent with the `forward` method behavior
             if not frag.variadic:
-                self.cursor += 1
+                cursor += 1
+
+        mix.cursors[tid] = cursor
 
         last = self.fragments[-1]
         if last.variadic and last.name not in mix.assignes:
             mix.assignes[last.name] = []
 
+        self._settle(mix, was_satisfied=was_satisfied, now_satisfied=cursor >= self.required)
+
     def fetch(
         self,
         mix: Mix,
         frag: Fragment,
         buffer: Buffer,
         upper_separators: str,
+    ):
+        receiver = frag.receiver
+
+        if type(receiver) not in DIRECT_RECEIVERS:
+            return self._receive(mix, frag, buffer, upper_separators)
+
+        # NOTE: inline version of `_receive` for built-in receivers, no closures are created here.
+        assignes = mix.assignes
+        name = frag.name
+        tail = token = pending = None
+
+        try:
+            if receiver.fetches:
+                if frag.separators is None:
+                    separators = upper_separators
+                elif frag.hybrid_separators:
+                    separators = frag.separators + upper_separators
+                else:
+                    separators = frag.separators
+
+                val, tail, token = frag.capture.capture(buffer, separators)
+
+                if frag.validator is not None and not frag.validator(val):
+                    raise ValidateRejected(f"Validation failed for {name}, got {val}")
+
+                if frag.transformer is not None:
+                    try:
+                        val = frag.transformer(val)
+                    except Exception as e:
+                        raise TransformPanic(f"Failed to transform {name} via {frag.transformer}, got {val}") from e
+
+                    if isawaitable(val):
+                        pending = _check_pending(frag, val)
+
+                if frag.batch_validator is not None or frag.batch_transformer is not None:
+                    if mix.deferred is not None and type(receiver) is Rx and not frag.variadic:
+                        mix.deferred[name] = frag
+                    else:
+                        val = batch_single(frag, val)
+            else:
+                val = None
+
+            val = receiver.direct(Some(assignes[name]) if name in assignes else None, val)
+        except (CaptureRejected, ValidateRejected, TransformPanic):
+            raise
+        except Exception as e:
+            raise ReceivePanic from e
+
+        if frag.variadic:
+            if name in assignes:
+                assignes[name].append(val)
+            else:
+                assignes[name] = [val]
+        else:
+            assignes[name] = val
+
+        if pending is not None:
+            mix.pending.append((name, len(assignes[name]) - 1 if frag.variadic else None, pending))
+
+        # NOTE: apply first, applying an ahead token drops the latest ahead segment, which would be the tail otherwise.
+        if token is not None:
+            token.apply()
+
+        if tail is not None:
+            buffer.add_to_ahead(tail.value)
+
+    def _receive(
+        self,
+        mix: Mix,
+        frag: Fragment,
+        buffer: Buffer,
+        upper_separators: str,
     ):
         tail = cast(Maybe[Any], None)
         token = None
@@ -88,6 +298,12 @@ class Track:
                 except Exception as e:
                     raise TransformPanic(f"Failed to transform {frag.name} via {frag.transformer}, got {val}") from e
 
+                if isawaitable(val):
+                    _check_pending(frag, val)
+
+            if frag.batch_validator is not None or frag.batch_transformer is not None:
+                val = batch_single(frag, val)
+
             return val
 
         def rxprev():
@@ -113,12 +329,13 @@ class Track:
         except Exception as e:
             raise ReceivePanic from e
 
-        if tail is not None:
-            buffer.add_to_ahead(tail.value)
-
+        # NOTE: apply first, applying an ahead token drops the latest ahead segment, which would be the tail otherwise.
         if token is not None:
             token.apply()
 
+        if tail is not None:
+            buffer.add_to_ahead(tail.value)
+
     @contextmanager
     def around(self, mix: Mix, fragment: Fragment):
         # NOTE: around method ensures the rejected group is updated correctly
@@ -136,40 +353,158 @@ class Track:
     def forward(
         self,
         mix: Mix,
+        tid: int,
         buffer: Buffer,
         separators: str,
     ):
-        if self.cursor >= self.max_length:
+        cursor = mix.cursors[tid]
+
+        if cursor >= self.max_length:
             return
 
-        first = self.fragments[self.cursor]
+        if self.regex_runs and cursor in self.regex_runs:
+            hit = self._forward_run(mix, tid, self.regex_runs[cursor], buffer, separators)
+
+            if hit is not None:
+                return hit
+
+        first = self.fragments[cursor]
 
         with self.around(mix, first):
             self.fetch(mix, first, buffer, separators)
 
         if not first.variadic:
-            self.cursor += 1
+            cursor = mix.cursors[tid] = cursor + 1
+
+            if cursor == self.required:
+                self._settle(mix, was_satisfied=False, now_satisfied=True)
 
         return first
 
-    def emit_header(self, mix: Mix, segment: str):
-        self.emitted = True
+    def _forward_run(self, mix: Mix, tid: int, run: RegexRun, buffer: Buffer, upper_separators: str):
+        # NOTE: a fast path only, returns None without consuming anything if the joint pattern does not match,
+        #       then the fragments are matched one by one to report the same errors (and partial assignments).
+        first = run.fragments[0]
+
+        if first.separators is None:
+            separators = upper_separators
+        elif first.hybrid_separators:
+            separators = first.separators + upper_separators
+        else:
+            separators = first.separators
+
+        values = []
+        token = buffer.next(separators)
+
+        try:
+            val = regex_subject(token.val, match_quote=run.match_quote)
+
+            match = run.compiled.match(val)
+            if match is None:
+                return
+
+            for ix, frag in enumerate(run.fragments):
+                start, end = match.span(f"_fuse{ix}")
+                capture = cast("RegexCapture", frag.capture)
+
+                sub = capture.compiled.fullmatch(val, start, end)
+                if sub is None:
+                    # NOTE: anchors or lookarounds which behave differently inside the joint pattern.
+                    return
+
+                if frag.validator is not None and not frag.validator(sub):
+                    raise ValidateRejected(f"Validation failed for {frag.name}, got {sub}")
+
+                if frag.transformer is not None:
+                    try:
+                        values.append(frag.transformer(sub))
+                    except Exception as e:
+                        raise TransformPanic(f"Failed to transform {frag.name} via {frag.transformer}, got {sub}") from e
+                else:
+                    values.append(sub)
+        except (CaptureRejected, ValidateRejected, TransformPanic):
+            raise
+        except Exception as e:
+            raise ReceivePanic from e
+
+        for frag, value in zip(run.fragments, values, strict=True):
+            mix.assignes[frag.name] = value
+
+            if frag.transformer is not None and isawaitable(value):
+                mix.pending.append((frag.name, None, value))
+
+        token.apply()
+
+        if match.end() < len(val):
+            buffer.add_to_ahead(val[match.end() :])
+
+        cursor = mix.cursors[tid]
+        now = mix.cursors[tid] = cursor + len(run.fragments)
+
+        if cursor < self.required <= now:
+            self._settle(mix, was_satisfied=False, now_satisfied=True)
+
+        return run.fragments[-1]
+
+    def emit_header(self, mix: Mix, tid: int, segment: str):
+        mix.emitted[tid] = True
 
         if self.header is None:
             return
 
         header = self.header
 
+        if type(header.receiver) not in DIRECT_RECEIVERS:
+            return self._receive_header(mix, header, segment)
+
+        assignes = mix.assignes
+        name = header.name
+        pending = None
+
+        with self.around(mix, header):
+            try:
+                val = segment
+
+                if header.receiver.fetches:
+                    if header.validator is not None and not header.validator(segment):
+                        raise ValidateRejected(f"Validation failed for {name}, got {segment}")
+
+                    if header.transformer is not None:
+                        try:
+                            val = header.transformer(segment)
+                        except Exception as e:
+                            raise TransformPanic(f"Failed to transform {name} via {header.transformer}, got {segment}") from e
+
+                        if isawaitable(val):
+                            pending = _check_pending(header, val)
+
+                val = header.receiver.direct(Some(assignes[name]) if name in assignes else None, val)
+            except (CaptureRejected, ValidateRejected, TransformPanic):
+                raise
+            except Exception as e:
+                raise ReceivePanic from e
+
+            assignes[name] = val
+
+            if pending is not None:
+                mix.pending.append((name, None, pending))
+
+    def _receive_header(self, mix: Mix, header: Fragment, segment: str):
         def rxfetch():
             if header.validator is not None and not header.validator(segment):
                 raise ValidateRejected(f"Validation failed for {header.name}, got {segment}")
 
             if header.transformer is not None:
                 try:
-                    return header.transformer(segment)
+                    val = header.transformer(segment)
                 except Exception as e:
                     raise TransformPanic(f"Failed to transform {header.name} via {header.transformer}, got {segment}") from e
 
+                if isawaitable(val):
+                    _check_pending(header, val)
+
+                return val
+
             return segment
 
         def rxprev():
@@ -187,66 +522,279 @@ class Track:
             except Exception as e:
                 raise ReceivePanic from e
 
+    def reset(self, mix: Mix, tid: int):
+        was_satisfied = mix.cursors[tid] >= self.required
+        mix.cursors[tid] = 0
+        self._settle(mix, was_satisfied=was_satisfied, now_satisfied=self.required == 0)
+
+    def __bool__(self):
+        return bool(self.fragments)
+
+
+class TrackView:
+    """Reads the state of one track in a mix, for inspection (tests, debugging) rather than analysis."""
+
+    __slots__ = ("mix", "tid", "track")
+
+    mix: Mix
+    tid: int
+    track: Track
+
+    def __init__(self, mix: Mix, tid: int):
+        self.mix = mix
+        self.tid = tid
+        self.track = mix.tracks[tid]
+
     @property
-    def assignable(self):
-        return self.cursor < self.max_length
+    def fragments(self):
+        return self.track.fragments
 
-    def copy(self):
-        return Track(self.fragments, self.header)
+    @property
+    def header(self):
+        return self.track.header
 
-    def reset(self):
-        self.cursor = 0
+    @property
+    def forwarding(self):
+        return self.track.forwarding
+
+    @property
+    def cursor(self):
+        return self.mix.cursors[self.tid]
+
+    @property
+    def emitted(self):
+        return self.mix.emitted[self.tid]
+
+    @property
+    def satisfied(self):
+        return self.mix.cursors[self.tid] >= self.track.required
+
+    @property
+    def assignable(self):
+        return self.mix.cursors[self.tid] < self.track.max_length
 
     def __bool__(self):
-        return bool(self.fragments)
+        return bool(self.track)
 
 
 class Preset:
-    __slots__ = ("option_tracks", "subcommand_track")
+    """The track layout of a command: the subcommand track first (id offset 0), then options in order."""
+
+    __slots__ = ("layout", "option_ids", "option_tracks", "stage_unsatisfied", "subcommand_track", "unsatisfied")
 
     subcommand_track: Track
     option_tracks: dict[str, Track]
 
+    layout: list[Track]
+    option_ids: dict[str, int]
+    unsatisfied: int
+    stage_unsatisfied: int
+
     def __init__(self, subcommand_track: Track, option_tracks: dict[str, Track]):
         self.subcommand_track = subcommand_track
-        self.option_tracks = option_tracks
+        self.option_tracks = {}
 
         assert_fragments_order(subcommand_track.fragments)
 
-        for track in self.option_tracks.values():
-            assert_fragments_order(track.fragments)
+        self.layout = [subcommand_track]
+        self.option_ids = {}
+        self.unsatisfied = 1 if subcommand_track.required else 0
+        self.stage_unsatisfied = 0
+
+        for name, track in option_tracks.items():
+            self.add_option_track(name, track)
+
+    def add_option_track(self, name: str, track: Track):
+        assert_fragments_order(track.fragments)
+
+        if name in self.option_ids:
+            previous = self.option_tracks[name]
+
+            if previous.required:
+                self.unsatisfied -= 1
+                if not previous.forwarding:
+                    self.stage_unsatisfied -= 1
+
+            self.layout[self.option_ids[name]] = track
+        else:
+            self.option_ids[name] = len(self.layout)
+            self.layout.append(track)
+
+        self.option_tracks[name] = track
+
+        if track.required:
+            self.unsatisfied += 1
+            if not track.forwarding:
+                self.stage_unsatisfied += 1
 
 
 class Mix:
-    __slots__ = ("assignes", "command_tracks", "option_tracks", "rejected_group")
+    __slots__ = (
+        "assignes",
+        "commands",
+        "cursors",
+        "deferred",
+        "emitted",
+        "pending",
+        "rejected_group",
+        "stage_unsatisfied",
+        "tracks",
+        "unsatisfied",
+    )
 
     assignes: dict[str, Any]
 
-    command_tracks: dict[tuple[str, ...], Track]
-    option_tracks: dict[tuple[tuple[str, ...], str], Track]
+    # NOTE: flat per-analysis state, indexed by track id.
+    #       Ids of a command are allocated in one block when entered: `base + Preset.option_ids[...]`.
+    tracks: list[Track]
+    cursors: list[int]
+    emitted: list[bool]
+    commands: dict[tuple[str, ...], tuple[int, Preset]]
 
     rejected_group: set[FragmentGroup]
 
+    # NOTE: running counters, maintained by the tracks when the cursor crosses `Track.required`.
+    #       `unsatisfied` counts every track, `stage_unsatisfied` counts the non-forwarding option tracks
+    #       of the latest entered command (those of the previous commands are unreachable anyway).
+    unsatisfied: int
+    stage_unsatisfied: int
+
+    # NOTE: None unless in batch analysis, then fragments whose batch validator and transformer are deferred,
+    #       by name, their values in `assignes` are the output of the per-token validator and transformer.
+    deferred: dict[str, Fragment] | None
+
+    # NOTE: (name, index in the variadic list or None, awaitable) of async transformers, see `resolve`.
+    pending: list[tuple[str, int | None, Awaitable[Any]]]
+
     def __init__(self):
         self.assignes = {}
-        self.command_tracks = {}
-        self.option_tracks = {}
+        self.pending = []
+        self.tracks = []
+        self.cursors = []
+        self.emitted = []
+        self.commands = {}
         self.rejected_group = set()
+        self.unsatisfied = 0
+        self.stage_unsatisfied = 0
+        self.deferred = None
+
+    def update(self, root: tuple[str, ...], preset: Preset) -> int:
+        base = len(self.tracks)
+        layout = preset.layout
+        length = len(layout)
+
+        self.tracks.extend(layout)
+        self.cursors.extend([0] * length)
+        self.emitted.extend([False] * length)
+        self.commands[root] = base, preset
+
+        self.unsatisfied += preset.unsatisfied
+        self.stage_unsatisfied = preset.stage_unsatisfied
+
+        return base
+
+    def command_id(self, command: tuple[str, ...]) -> int:
+        return self.commands[command][0]
+
+    def option_id(self, owner: tuple[str, ...], keyword: str) -> int:
+        base, preset = self.commands[owner]
+        return base + preset.option_ids[keyword]
+
+    def track_satisfied(self, tid: int):
+        return self.cursors[tid] >= self.tracks[tid].required
 
     def complete(self):
-        for track in self.command_tracks.values():
-            track.complete(self)
+        tracks = self.tracks
+
+        for base, _ in self.commands.values():
+            tracks[base].complete(self, base)
 
     @property
     def satisfied(self):
-        for track in self.command_tracks.values():
-            if not track.satisfied:
-                return False
+        return self.unsatisfied == 0
+
+    def reset(self):
+        self.assignes.clear()
+        self.tracks.clear()
+        self.cursors.clear()
+        self.emitted.clear()
+        self.commands.clear()
+        self.rejected_group.clear()
+
+        if self.deferred is not None:
+            self.deferred.clear()
+
+        for _, _, awaitable in self.pending:
+            _discard(awaitable)
+
+        self.pending.clear()
+
+        self.unsatisfied = 0
+        self.stage_unsatisfied = 0
+
+    def clone(self):
+        # NOTE: values in assignes are shared, while the containers of variadic fragments are copied.
+        mix = Mix.__new__(Mix)
+        mix.assignes = {k: v.copy() if type(v) is list else v for k, v in self.assignes.items()}
+        mix.tracks = self.tracks.copy()
+        mix.cursors = self.cursors.copy()
+        mix.emitted = self.emitted.copy()
+        mix.commands = self.commands.copy()
+        mix.rejected_group = self.rejected_group.copy()
+        mix.unsatisfied = self.unsatisfied
+        mix.stage_unsatisfied = self.stage_unsatisfied
+        mix.deferred = None if self.deferred is None else self.deferred.copy()
+        # NOTE: awaitables are shared, only one of the clones can resolve them.
+        mix.pending = self.pending.copy()
+        return mix
+
+    async def resolve(self, limit: int | None = None):
+        """Await the pending async transformations concurrently (at most `limit` at once) and assign their values.
+
+        Every transformation is awaited even if some fail, then the first failure is raised as `TransformPanic`.
+        """
+
+        pending, self.pending = self.pending, []
+
+        if not pending:
+            return
+
+        semaphore = asyncio.Semaphore(limit) if limit is not None else None
+
+        async def run(awaitable: Awaitable[Any]):
+            if semaphore is None:
+                return await awaitable
+
+            async with semaphore:
+                return await awaitable
+
+        results = await asyncio.gather(*(run(awaitable) for _, _, awaitable in pending), return_exceptions=True)
+        failure = None
 
-        return all(track.satisfied for track in self.option_tracks.values())
+        for (name, index, _), result in zip(pending, results, strict=True):
+            if isinstance(result, BaseException):
+                if failure is None:
+                    failure = name, result
 
-    def update(self, root: tuple[str, ...], preset: Preset):
-        self.command_tracks[root] = preset.subcommand_track.copy()
+                continue
 
-        for track_id, track in preset.option_tracks.items():
-            self.option_tracks[root, track_id] = track.copy()
+            if index is None:
+                self.assignes[name] = result
+            else:
+                self.assignes[name][index] = result
+
+        if failure is not None:
+            name, exc = failure
+            raise TransformPanic(f"Failed to transform {name} asynchronously") from exc
+
+    @property
+    def command_tracks(self) -> dict[tuple[str, ...], TrackView]:
+        return {command: TrackView(self, base) for command, (base, _) in self.commands.items()}
+
+    @property
+    def option_tracks(self) -> dict[tuple[tuple[str, ...], str], TrackView]:
+        return {
+            (command, keyword): TrackView(self, base + offset)
+            for command, (base, preset) in self.commands.items()
+            for keyword, offset in preset.option_ids.items()
+        }
@@ -6,9 +6,9 @@ from typing import TYPE_CHECKING, Iterable, MutableMapping
 
 from elaina_segment import SEPARATORS
 
-from firework.util import RadixTrie
+from firework.util import FrozenRadixTrie, RadixTrie
 
-from .fragment import assert_fragments_order
+from .compiled import CompiledPattern
 from .mix import Preset, Track
 from .snapshot import AnalyzeSnapshot, ProcessingState
 
@@ -25,7 +25,7 @@ class SubcommandPattern:
     separators: str = SEPARATORS
 
     aliases: list[str] = field(default_factory=list)
-    prefixes: RadixTrie[str] | None = field(default=None)
+    prefixes: RadixTrie[str] | FrozenRadixTrie[str] | None = field(default=None)
     compact_header: bool = False
     enter_instantly: bool = False
     compact_aliases: bool = False
@@ -34,6 +34,7 @@ class SubcommandPattern:
     _subcommands: MutableMapping[str, SubcommandPattern] = field(default_factory=dict)
     _options: list[OptionPattern] = field(default_factory=list)
     _compact_keywords: RadixTrie[str] | None = field(default=None)
+    _frozen: bool = field(default=False, repr=False)
 
     @classmethod
     def build(
@@ -66,17 +67,12 @@ class SubcommandPattern:
         )
 
         if prefixes:
-            trie = subcommand.prefixes = RadixTrie()  # type: ignore
-
-            for prefix in prefixes:
-                trie.set(prefix, prefix)
+            subcommand.prefixes = FrozenRadixTrie.from_sorted(sorted(set(prefixes)))
 
         return subcommand
 
     def create_snapshot(self, state: ProcessingState = ProcessingState.COMMAND):
-        snapshot = AnalyzeSnapshot(command=[self.header], state=state, traverses={(self.header,): self})
-        snapshot.mix.update((self.header,), self.preset)
-        return snapshot
+        return AnalyzeSnapshot(command=[self.header], state=state, traverses={(self.header,): self})
 
     @property
     def root_entrypoint(self):
@@ -90,10 +86,15 @@ class SubcommandPattern:
     def header_entrypoint(self):
         return self.create_snapshot(ProcessingState.HEADER)
 
-    def _add_option_track(self, name: str, fragments: tuple[Fragment, ...], header: Fragment | None = None):
-        assert_fragments_order(fragments)
-
-        self.preset.option_tracks[name] = Track(fragments, header=header)
+    def _add_option_track(
+        self,
+        name: str,
+        fragments: tuple[Fragment, ...],
+        header: Fragment | None = None,
+        *,
+        forwarding: bool = True,
+    ):
+        self.preset.add_option_track(name, Track(fragments, header=header, forwarding=forwarding))
 
     def subcommand(
         self,
@@ -123,23 +124,35 @@ class SubcommandPattern:
         return self.subcommand_from_pattern(pattern)
 
     def subcommand_from_pattern(self, pattern: SubcommandPattern):
-        self._subcommands[pattern.header] = pattern
-        for alias in pattern.aliases:
-            self._subcommands[alias] = pattern
+        self.register_many((pattern,))
+        return pattern
+
+    def register_many(self, patterns: Iterable[SubcommandPattern]):
+        """Register several subcommand patterns at once, the keyword tables are updated in one pass."""
 
-        if pattern.compact_header:
-            trie = RadixTrie()
-            trie.set(pattern.header, pattern.header)
+        subcommands: dict[str, SubcommandPattern] = {}
+        compact_keywords: list[str] = []
 
+        for pattern in patterns:
+            subcommands[pattern.header] = pattern
             for alias in pattern.aliases:
-                trie.set(alias, alias)
+                subcommands[alias] = pattern
 
-            if self._compact_keywords is not None:
-                trie.update(self._compact_keywords.items())
+            if pattern.compact_header:
+                compact_keywords.append(pattern.header)
+                compact_keywords.extend(pattern.aliases)
 
-            self._compact_keywords = trie
+        self._subcommands.update(subcommands)
 
-        return pattern
+        if compact_keywords:
+            trie = self._compact_keywords
+            if trie is None:
+                trie = self._compact_keywords = RadixTrie()
+
+            for keyword in compact_keywords:
+                trie.set(keyword, keyword)
+
+        return self
 
     def option(
         self,
@@ -155,6 +168,9 @@ class SubcommandPattern:
         header_separators: str | None = None,
         forwarding: bool = True,
     ):
+        if self._frozen:
+            raise RuntimeError("pattern is frozen")
+
         if separators is None:
             separators = self.separators
         elif hybrid_separators:
@@ -173,7 +189,7 @@ class SubcommandPattern:
         )
 
         self._options.append(pattern)
-        self._add_option_track(keyword, fragments, header=header_fragment)
+        self._add_option_track(keyword, fragments, header=header_fragment, forwarding=forwarding)
 
         if header_separators and not fragments:
             raise ValueError("header_separators must be used with fragments")
@@ -183,6 +199,39 @@ class SubcommandPattern:
     def register_to(self, parent: SubcommandPattern):
         parent.subcommand_from_pattern(self)
 
+    def freeze(self):
+        """Collapse layered bindings (e.g. the `ChainMap`s of Yanagi) of the whole tree into a dict and a tuple.
+
+        Call it once the registration is finished: later changes made to the layers are not visible anymore,
+        and adding an option to a frozen pattern raises `RuntimeError`. Subcommands can still be registered.
+        """
+
+        stack = [self]
+        visited: set[int] = set()
+
+        while stack:
+            pattern = stack.pop()
+
+            if id(pattern) in visited:
+                continue
+
+            visited.add(id(pattern))
+
+            if type(pattern._subcommands) is not dict:
+                pattern._subcommands = dict(pattern._subcommands)
+
+            if type(pattern._options) is not tuple:
+                pattern._options = tuple(pattern._options)  # type: ignore
+
+            pattern._frozen = True
+
+            stack.extend(pattern._subcommands.values())
+
+        return self
+
+    def compile(self):
+        return CompiledPattern(self)
+
 
 @dataclass
 class OptionPattern:
@@ -200,13 +249,7 @@ class OptionPattern:
     @cached_property
     def _trigger(self):
         if self.compact_header:
-            trie = RadixTrie[str]()
-            trie.set(self.keyword, self.keyword)
-
-            for alias in self.aliases:
-                trie.set(alias, alias)
-
-            return trie
+            return FrozenRadixTrie.from_sorted(sorted({self.keyword, *self.aliases}))
 
         return {self.keyword, *self.aliases}
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Generic, TypeVar
+from typing import Any, Callable, ClassVar, Generic, TypeVar
 
 from firework.util import Maybe
 
@@ -12,11 +12,20 @@ RxPut = Callable[[T], None]
 
 
 class Rx(Generic[T]):
+    # NOTE: built-in receivers also describe their `receive` as a direct operation, which tracks apply inline:
+    #       fetch a value first if `fetches`, then put `direct(prev, value)`. See `DIRECT_RECEIVERS`.
+    fetches: ClassVar[bool] = True
+
     def receive(self, fetch: RxFetch, prev: RxPrev, put: RxPut) -> None:  # noqa: ARG002
         put(fetch())
 
+    def direct(self, prev: Maybe[T], val: Any) -> T:  # noqa: ARG002
+        return val
+
 
 class CountRx(Rx[int]):
+    fetches = False
+
     def receive(self, fetch: RxFetch, prev: RxPrev[int], put: RxPut[int]) -> None:  # noqa: ARG002
         v = prev()
 
@@ -25,6 +34,9 @@ class CountRx(Rx[int]):
         else:
             put(v.value + 1)
 
+    def direct(self, prev: Maybe[int], val: Any) -> int:  # noqa: ARG002
+        return 1 if prev is None else prev.value + 1
+
 
 class AccumRx(Rx[T]):
     def receive(self, fetch: RxFetch, prev: RxPrev[list[T]], put: RxPut[list[T]]) -> None:
@@ -35,8 +47,13 @@ class AccumRx(Rx[T]):
         else:
             put([*v.value, fetch()])
 
+    def direct(self, prev: Maybe[list[T]], val: T) -> list[T]:
+        return [val] if prev is None else [*prev.value, val]
+
 
 class ConstRx(Generic[T], Rx[T]):
+    fetches = False
+
     value: T
 
     def __init__(self, value: T):
@@ -45,6 +62,9 @@ class ConstRx(Generic[T], Rx[T]):
     def receive(self, fetch: RxFetch, prev: RxPrev[T], put: RxPut[T]) -> None:  # noqa: ARG002
         put(self.value)
 
+    def direct(self, prev: Maybe[T], val: Any) -> T:  # noqa: ARG002
+        return self.value
+
 
 class AddRx(Rx[int]):
     def receive(self, fetch: RxFetch, prev: RxPrev[int], put: RxPut[int]) -> None:
@@ -55,3 +75,10 @@ class AddRx(Rx[int]):
             put(num + 1)
         else:
             put(v.value + num)
+
+    def direct(self, prev: Maybe[int], val: int) -> int:
+        return val + 1 if prev is None else prev.value + val
+
+
+# NOTE: exact types only, a subclass may override `receive` and must go through the closure protocol.
+DIRECT_RECEIVERS: frozenset[type[Rx[Any]]] = frozenset({Rx, CountRx, AccumRx, ConstRx, AddRx})
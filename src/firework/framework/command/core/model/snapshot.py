@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from enum import Enum
 from typing import TYPE_CHECKING, Iterable
 
 from .mix import Mix
 
 if TYPE_CHECKING:
+    from .compiled import CompiledPattern
     from .pattern import OptionPattern, SubcommandPattern
 
 
@@ -20,9 +22,12 @@ class AnalyzeSnapshot:
     __slots__ = (
         "available_options",
         "command",
+        "command_id",
         "endpoint",
         "mix",
         "option",
+        "option_id",
+        "path",
         "state",
         "traverses",
     )
@@ -32,6 +37,12 @@ class AnalyzeSnapshot:
     command: list[str]
     option: tuple[tuple[str, ...], str, OptionPattern] | None
 
+    # NOTE: `path` is `tuple(command)`, kept along to avoid rebuilding it for every segment.
+    #       `command_id` and `option_id` are the ids of the current tracks in `mix`.
+    path: tuple[str, ...]
+    command_id: int
+    option_id: int
+
     # Record
     mix: Mix
     endpoint: tuple[str, ...] | None
@@ -46,31 +57,79 @@ class AnalyzeSnapshot:
     ):
         self.command = command
         self.state = state
+        self.option = None
+        self.option_id = -1
 
         self.traverses = traverses
         self.endpoint = None
         self.mix = Mix()
         self.available_options = {}
 
-        self._options_enter(tuple(command), traverses[tuple(command)])
+        self.path = tuple(command)
+        pattern = traverses[self.path]
+        self.command_id = self.mix.update(self.path, pattern.preset)
+
+        self._options_enter(self.path, pattern)
 
     @property
     def context(self):
-        return self.traverses[tuple(self.command)]
+        return self.traverses[self.path]
+
+    def reset(self, state: ProcessingState = ProcessingState.COMMAND):
+        # NOTE: rewinds to the root command, the Mix and its arrays are kept for reuse.
+        #       Results (and assignes) from the previous analysis are no longer valid after this.
+        root = self.command[0]
+        key = (root,)
+        pattern = self.traverses[key]
+
+        del self.command[1:]
+        self.traverses.clear()
+        self.traverses[key] = pattern
+
+        self.state = state
+        self.option = None
+        self.option_id = -1
+        self.endpoint = None
+        self.available_options.clear()
+
+        self.mix.reset()
+        self.path = key
+        self.command_id = self.mix.update(key, pattern.preset)
+
+        self._options_enter(key, pattern)
+
+    def clone(self):
+        """Fork the snapshot, the copy could go on with analysis independently of this one."""
+
+        snapshot = self.__class__.__new__(self.__class__)
+        snapshot._clone_from(self)
+        return snapshot
+
+    def _clone_from(self, other: AnalyzeSnapshot):
+        self.state = other.state
+        self.command = other.command.copy()
+        self.option = other.option
+        self.path = other.path
+        self.command_id = other.command_id
+        self.option_id = other.option_id
+        self.mix = other.mix.clone()
+        self.endpoint = other.endpoint
+        self.traverses = other.traverses.copy()
+        self.available_options = other.available_options.copy()
 
     def enter_subcommand(self, trigger: str, pattern: SubcommandPattern):
-        self._options_exit(tuple(self.command))
+        self._options_exit(self.path)
 
         self.command.append(pattern.header)
         self.state = ProcessingState.COMMAND
         self.option = None
 
-        key = tuple(self.command)
+        key = self.path = (*self.path, pattern.header)
         self.traverses[key] = pattern
-        self.mix.update(key, pattern.preset)
 
-        track = self.mix.command_tracks[key]
-        track.emit_header(self.mix, trigger)
+        mix = self.mix
+        tid = self.command_id = mix.update(key, pattern.preset)
+        mix.tracks[tid].emit_header(mix, tid, trigger)
 
         self._options_enter(key, pattern)
 
@@ -81,18 +140,21 @@ class AnalyzeSnapshot:
         option_keyword: str,
         pattern: OptionPattern,
     ):
-        track = self.mix.option_tracks[owned_command, option_keyword]
+        mix = self.mix
+        tid = mix.option_id(owned_command, option_keyword)
 
-        if track.emitted and not pattern.allow_duplicate:
+        if mix.emitted[tid] and not pattern.allow_duplicate:
             return False
 
-        track.emit_header(self.mix, trigger)
+        track = mix.tracks[tid]
+        track.emit_header(mix, tid, trigger)
 
         if track:
-            track.reset()
+            track.reset(mix, tid)
 
             self.state = ProcessingState.OPTION
             self.option = owned_command, option_keyword, pattern
+            self.option_id = tid
 
         return True
 
@@ -102,21 +164,12 @@ class AnalyzeSnapshot:
 
     @property
     def stage_satisfied(self):
-        command_satisfied = self.mix.command_tracks[tuple(self.command)].satisfied
-
-        if command_satisfied:
-            for owner, options in self.available_options.items():
-                # NOTE: stage satisfied += for all option tracks, either forwarding or satisfied.
-
-                for option in options:
-                    if not option.forwarding and not self.mix.option_tracks[owner, option.keyword].satisfied:
-                        return False
-
-        return command_satisfied
+        # NOTE: stage satisfied += for all option tracks, either forwarding or satisfied.
+        return self.mix.stage_unsatisfied == 0 and self.mix.track_satisfied(self.command_id)
 
     def determine(self):
         self.state = ProcessingState.COMMAND
-        self.endpoint = tuple(self.command)
+        self.endpoint = self.path
 
     def get_subcommand(self, val: str):
         context = self.context
@@ -158,3 +211,39 @@ class AnalyzeSnapshot:
 
     def _options_exit(self, owner: tuple[str, ...]):
         self.available_options[owner] = [x for x in self.available_options[owner] if x.forwarding]
+
+
+class SnapshotPool:
+    __slots__ = ("idle", "maxsize", "pattern")
+
+    pattern: SubcommandPattern | CompiledPattern
+    idle: list[AnalyzeSnapshot]
+    maxsize: int
+
+    def __init__(self, pattern: SubcommandPattern | CompiledPattern, maxsize: int = 16):
+        self.pattern = pattern
+        self.idle = []
+        self.maxsize = maxsize
+
+    def acquire(self, state: ProcessingState = ProcessingState.COMMAND):
+        if self.idle:
+            snapshot = self.idle.pop()
+            snapshot.state = state
+            return snapshot
+
+        return self.pattern.create_snapshot(state)
+
+    def release(self, snapshot: AnalyzeSnapshot):
+        # NOTE: reset happens here, so the assigned values could be collected as early as possible.
+        if len(self.idle) < self.maxsize:
+            snapshot.reset()
+            self.idle.append(snapshot)
+
+    @contextmanager
+    def borrow(self, state: ProcessingState = ProcessingState.COMMAND):
+        snapshot = self.acquire(state)
+
+        try:
+            yield snapshot
+        finally:
+            self.release(snapshot)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Generic, Iterable, TypeVar
+
+from elaina_segment import SEPARATORS, Buffer
+from elaina_segment.err import OutOfData
+
+from .analyzer import Accepted, analyze_loopflow
+from .model.compiled import CompiledPattern
+from .model.snapshot import ProcessingState
+
+if TYPE_CHECKING:
+    from elaina_segment import AheadToken, Segment, SegmentToken
+
+    from .analyzer import Rejected
+    from .model.pattern import SubcommandPattern
+
+T = TypeVar("T")
+
+
+class SharedSegments(Generic[T]):
+    """Segments of a source buffer, tokenized lazily and only once for every reader."""
+
+    __slots__ = ("exhausted", "segments", "separators", "source")
+
+    source: Buffer[T]
+    separators: str
+    segments: list[Segment[T]]
+    exhausted: bool
+
+    def __init__(self, source: Buffer[T], separators: str):
+        self.source = source
+        self.separators = separators
+        self.segments = []
+        self.exhausted = False
+
+    def get(self, index: int) -> Segment[T]:
+        segments = self.segments
+
+        while index >= len(segments):
+            if self.exhausted:
+                raise OutOfData
+
+            try:
+                token = self.source.next(self.separators)
+            except OutOfData:
+                self.exhausted = True
+                raise
+
+            token.apply()
+            segments.append(token.val)
+
+        return segments[index]
+
+
+class ReplayToken(Generic[T]):
+    __slots__ = ("buffer", "val")
+
+    buffer: ReplayBuffer[T]
+    val: Segment[T]
+
+    def __init__(self, buffer: ReplayBuffer[T], val: Segment[T]):
+        self.buffer = buffer
+        self.val = val
+
+    def apply(self):
+        self.buffer.index += 1
+
+
+class ReplayBuffer(Generic[T]):
+    """A reading cursor over `SharedSegments`, with the subset of the `Buffer` interface sistana relies on.
+
+    Segments pushed back by the analyzer (compact header tails, regex leftovers...) belong to this reader only,
+    they are kept in a local `Buffer` and read before the shared segments.
+    """
+
+    __slots__ = ("index", "local", "pending", "shared")
+
+    shared: SharedSegments[T]
+    index: int
+    local: Buffer[T]
+    pending: bool
+
+    def __init__(self, shared: SharedSegments[T], index: int = 0, local: Buffer[T] | None = None):
+        self.shared = shared
+        self.index = index
+        self.local = Buffer([]) if local is None else local
+        self.pending = local is not None
+
+    def __repr__(self):
+        return f"ReplayBuffer(index={self.index}, local={self.local!r})"
+
+    def next(self, until: str = SEPARATORS) -> SegmentToken[T] | AheadToken[T] | ReplayToken[T]:
+        if self.pending:
+            try:
+                return self.local.next(until)
+            except OutOfData:
+                # NOTE: only pay for the exception once per pushback.
+                self.pending = False
+
+        # NOTE: `until` is not looked at, `SpeculativeGroup` only shares segments when every reader splits by the same separators.
+        return ReplayToken(self, self.shared.get(self.index))
+
+    def first(self) -> Segment[T]:
+        if self.pending:
+            try:
+                return self.local.first()
+            except IndexError:
+                pass
+
+        try:
+            return self.shared.get(self.index)
+        except OutOfData:
+            raise IndexError("buffer is empty") from None
+
+    def pushleft(self, *segments: Segment[T]):
+        self.local.pushleft(*segments)
+        self.pending = True
+
+    def add_to_ahead(self, val: Segment[T]):
+        self.local.add_to_ahead(val)
+        self.pending = True
+
+    def copy(self):
+        return ReplayBuffer(self.shared, self.index, self.local.copy() if self.pending else None)
+
+
+def _tree_separators(pattern: SubcommandPattern, result: set[str], visited: set[int]):
+    if id(pattern) in visited:
+        return
+
+    visited.add(id(pattern))
+    result.add(pattern.separators)
+
+    for option in pattern._options:
+        result.add(option.separators)
+
+    # NOTE: fragments with their own separators read the buffer with other separators than their owner.
+    preset = pattern.preset
+
+    for track in (preset.subcommand_track, *preset.option_tracks.values()):
+        for frag in track.fragments:
+            if frag.separators is not None:
+                result.add(frag.separators)
+
+    for subcommand in pattern._subcommands.values():
+        _tree_separators(subcommand, result, visited)
+
+
+class SpeculativeGroup:
+    """Analyzes one input against several root patterns, tokenizing the input only once.
+
+    When every pattern in the group (subcommands, options and fragments included) splits segments with the same separators,
+    the candidates read from one shared segment stream through `ReplayBuffer`s. Otherwise, each candidate works
+    on a copy of the buffer, like trying them one by one would do.
+    Patterns are inspected when the group is created, changes made to them afterwards are not taken into account.
+    """
+
+    __slots__ = ("patterns", "separators")
+
+    patterns: tuple[SubcommandPattern | CompiledPattern, ...]
+    separators: str | None
+
+    def __init__(self, patterns: Iterable[SubcommandPattern | CompiledPattern]):
+        self.patterns = tuple(patterns)
+
+        separators: set[str] = set()
+        visited: set[int] = set()
+
+        for pattern in self.patterns:
+            _tree_separators(pattern.pattern if isinstance(pattern, CompiledPattern) else pattern, separators, visited)
+
+        self.separators = separators.pop() if len(separators) == 1 else None
+
+    def _readers(self, buffer: Buffer[T]) -> Iterable[Buffer[T]]:
+        if self.separators is None:
+            return (buffer.copy() for _ in self.patterns)
+
+        shared = SharedSegments(buffer, self.separators)
+        return (ReplayBuffer(shared) for _ in self.patterns)  # type: ignore
+
+    def responses(self, buffer: Buffer[T], state: ProcessingState = ProcessingState.PREFIX):
+        """Yield the result of each pattern in priority (registration) order, lazily.
+
+        The source buffer is consumed in shared mode: do not read from it while iterating.
+        """
+
+        for pattern, reader in zip(self.patterns, self._readers(buffer), strict=True):
+            yield analyze_loopflow(pattern.create_snapshot(state), reader)
+
+    def analyze_all(self, buffer: Buffer[T], state: ProcessingState = ProcessingState.PREFIX) -> list[Accepted[T]]:
+        return [response for response in self.responses(buffer, state) if isinstance(response, Accepted)]
+
+    def analyze_first(self, buffer: Buffer[T], state: ProcessingState = ProcessingState.PREFIX) -> Accepted[T] | Rejected[T] | None:
+        """Return the first accepted result by priority, otherwise the rejection of the first pattern.
+
+        Later candidates are not analyzed at all once one is accepted. `None` means the group is empty.
+        """
+
+        rejected = None
+
+        for response in self.responses(buffer, state):
+            if isinstance(response, Accepted):
+                return response
+
+            if rejected is None:
+                rejected = response
+
+        return rejected
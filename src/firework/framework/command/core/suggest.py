@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from .analyzer import Suspended, analyze_loopflow
+from .model.compiled import CompiledPattern, path_table
+from .model.pattern import SubcommandPattern
+from .model.snapshot import AnalyzeSnapshot, ProcessingState
+
+if TYPE_CHECKING:
+    from elaina_segment import Buffer
+
+
+@dataclass
+class Suggestions:
+    headers: list[str] = field(default_factory=list)
+    subcommands: list[str] = field(default_factory=list)
+    options: list[str] = field(default_factory=list)
+    fragments: list[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.headers or self.subcommands or self.options or self.fragments)
+
+
+def _suggest_headers(snapshot: AnalyzeSnapshot, prefix: str, result: Suggestions):
+    context = snapshot.context
+    headers = [context.header, *context.aliases]
+
+    if snapshot.state is ProcessingState.PREFIX and context.prefixes is not None:
+        headers = [i + header for i in context.prefixes for header in headers]
+
+    result.headers.extend(sorted(i for i in headers if i.startswith(prefix)))
+
+
+def suggest_snapshot(snapshot: AnalyzeSnapshot, prefix: str = "", limit: int | None = None) -> Suggestions:
+    """Suggest what could come next for a (suspended) snapshot, without trial parsing.
+
+    `prefix` is the part of the segment being typed, `limit` bounds the keywords enumerated from the index.
+    """
+
+    result = Suggestions()
+    state = snapshot.state
+
+    if state is ProcessingState.PREFIX or state is ProcessingState.HEADER:
+        _suggest_headers(snapshot, prefix, result)
+        return result
+
+    mix = snapshot.mix
+
+    if state is ProcessingState.OPTION:
+        tid = snapshot.option_id
+        track = mix.tracks[tid]
+        cursor = mix.cursors[tid]
+
+        if cursor < track.max_length:
+            result.fragments.append(track.fragments[cursor].name)
+
+        if cursor < track.required:
+            # NOTE: any keyword here is either rejected or taken as the value of the current option.
+            return result
+    else:
+        tid = snapshot.command_id
+        track = mix.tracks[tid]
+        cursor = mix.cursors[tid]
+
+        if cursor < track.max_length:
+            result.fragments.append(track.fragments[cursor].name)
+
+    table = path_table(snapshot)
+    stage_satisfied = snapshot.stage_satisfied
+
+    for keyword in islice(table.keywords().iter_prefix(prefix), limit):
+        subcommand = table.subcommands.get(keyword)
+        if subcommand is not None and (stage_satisfied or subcommand.enter_instantly):
+            result.subcommands.append(keyword)
+
+        rank = table.exact_options.get(keyword)
+        if rank is None:
+            rank = table.compact_options.get(keyword)
+
+        if rank is not None:
+            option, owner = table.option_entries[rank]
+
+            if option.soft_keyword and not stage_satisfied:
+                continue
+
+            if not option.allow_duplicate and owner in mix.commands and mix.emitted[mix.option_id(owner, option.keyword)]:
+                continue
+
+            result.options.append(keyword)
+
+    return result
+
+
+def suggest(
+    pattern: SubcommandPattern | CompiledPattern | AnalyzeSnapshot,
+    buffer: Buffer[Any] | None = None,
+    prefix: str = "",
+    limit: int | None = None,
+) -> Suggestions:
+    """Suggest the next subcommands, option triggers and fragments after the consumed `buffer`.
+
+    The buffer is analyzed in incremental mode, a rejected input has no suggestions.
+    For keystroke-level latency, pass a `CompiledPattern` (or a snapshot created from it),
+    a plain `SubcommandPattern` is compiled on every call.
+    """
+
+    if isinstance(pattern, AnalyzeSnapshot):
+        snapshot = pattern
+    else:
+        if isinstance(pattern, SubcommandPattern):
+            pattern = pattern.compile()
+
+        snapshot = pattern.prefix_entrypoint
+
+    if buffer is not None and not isinstance(analyze_loopflow(snapshot, buffer, incremental=True), Suspended):
+        return Suggestions()
+
+    return suggest_snapshot(snapshot, prefix, limit)
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any, TypeAlias
 if TYPE_CHECKING:
     from dataclasses import Field
 
+    from .cache import PatternCache
     from .core.model.fragment import FragmentGroup
     from .core.model.pattern import OptionPattern, SubcommandPattern
     from .metadata import FragmentMetadata, OptionMetadata
@@ -25,3 +26,4 @@ YANAGI_INHERITED_SUBCOMMANDS: ContextVar[ChainMap[str, SubcommandPattern] | None
     "YANAGI_INHERITED_SUBCOMMANDS", default=None
 )
 YANAGI_INHERITED_OPTIONS: ContextVar[ChainMap[str, OptionPattern] | None] = ContextVar("YANAGI_INHERITED_OPTIONS", default=None)
+YANAGI_PATTERN_CACHE: ContextVar[PatternCache | None] = ContextVar("YANAGI_PATTERN_CACHE", default=None)
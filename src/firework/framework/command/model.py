@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 from collections import ChainMap
+from collections.abc import Mapping, MutableMapping
+from contextvars import Context, copy_context
 from dataclasses import MISSING, Field, dataclass, is_dataclass
 from dataclasses import fields as dc_fields
-from typing import TYPE_CHECKING, ClassVar, Iterable, TypeVar, cast, dataclass_transform
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Iterable, TypeVar, cast, dataclass_transform
 
 from elaina_segment import SEPARATORS, Buffer
 
 from firework.util import Some
 
+from .cache import field_metadata
 from .core.analyzer import Rejected, analyze_loopflow
 from .core.model.fragment import Fragment, FragmentGroup
 from .core.model.pattern import OptionPattern, SubcommandPattern
@@ -18,6 +21,7 @@ from .globals import (
     GLOBAL_OPTIONS_BIND,
     YANAGI_INHERITED_OPTIONS,
     YANAGI_INHERITED_SUBCOMMANDS,
+    YANAGI_PATTERN_CACHE,
 )
 from .metadata import FragmentMetadata, OptionMetadata, SubcommandMetadata, UnionMetadata
 from .specifiers import fragment, fragment_union, header_fragment
@@ -28,6 +32,98 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 
+def build_constructor(cls: type[T]) -> Callable[[dict[str, Any]], T]:
+    """Generate a constructor taking the field values in a dict, which skips the argument binding of `__init__`.
+
+    Dataclasses which the generated code cannot mimic (frozen, init-only or `init=False` fields, an `__init__` written in the
+    class body...) fall back to `__init__`.
+    """
+
+    params = cls.__dataclass_params__  # type: ignore
+    fields = dc_fields(cls)  # type: ignore
+
+    # NOTE: dataclass keeps an `__init__` written in the class body, the generated one is created by `__create_fn__`.
+    init = cls.__dict__.get("__init__")
+    init_generated = "__create_fn__" in getattr(getattr(init, "__code__", None), "co_qualname", "")
+
+    # NOTE: `__dataclass_fields__` also holds the pseudo-fields (ClassVar, InitVar) which `fields` leaves out.
+    if (
+        not params.init
+        or not init_generated
+        or params.frozen
+        or len(fields) != len(cls.__dataclass_fields__)  # type: ignore
+        or cls.__new__ is not object.__new__
+        or any(not i.init for i in fields)
+    ):
+        return lambda values: cls(**values)
+
+    namespace: dict[str, Any] = {"cls": cls, "new": object.__new__}
+    assigns = []
+
+    for ix, dc_field in enumerate(fields):
+        name = dc_field.name
+
+        if dc_field.default is not MISSING:
+            namespace[f"default_{ix}"] = dc_field.default
+            assigns.append(f"        self.{name} = values.get({name!r}, default_{ix})")
+        elif dc_field.default_factory is not MISSING:
+            namespace[f"factory_{ix}"] = dc_field.default_factory
+            assigns.append(f"        self.{name} = values[{name!r}] if {name!r} in values else factory_{ix}()")
+        else:
+            assigns.append(f"        self.{name} = values[{name!r}]")
+
+    lines = ["def construct(values):", "    self = new(cls)"]
+
+    if assigns:
+        lines.append("    try:")
+        lines.extend(assigns)
+        lines.append("    except KeyError as e:")
+        lines.append("        raise TypeError(f'{cls.__name__} missing the value of field {e.args[0]!r}') from None")
+
+    if hasattr(cls, "__post_init__"):
+        lines.append("    self.__post_init__()")
+
+    lines.append("    return self")
+
+    exec(compile("\n".join(lines), f"<yanagi constructor {cls.__qualname__}>", "exec"), namespace)  # noqa: S102
+    return namespace["construct"]
+
+
+class LazySubcommands(dict):
+    """Lazy guests of a built host by keyword, a layer of the host's subcommand bind behind the built subcommands.
+
+    A guest is built on the first lookup of its keyword (e.g. when the analysis enters it), then it is moved to the host.
+    Iterating the bind (compiling, freezing...) builds every guest left.
+    """
+
+    __slots__ = ("host",)
+
+    host: SubcommandPattern
+
+    def __init__(self, host: SubcommandPattern):
+        super().__init__()
+        self.host = host
+
+    def add(self, guest: type[YanagiCommandBase]):
+        metadata = guest.__yanagi_subcommand_metadata__
+
+        for keyword in (metadata.keyword, *metadata.aliases):
+            self[keyword] = guest
+
+    def __getitem__(self, keyword: str) -> SubcommandPattern:
+        guest: type[YanagiCommandBase] = super().__getitem__(keyword)
+        metadata = guest.__yanagi_subcommand_metadata__
+
+        for registered in (metadata.keyword, *metadata.aliases):
+            if self.get(registered) is guest:
+                del self[registered]
+
+        pattern = guest.get_command_pattern()
+        self.host.subcommand_from_pattern(pattern)
+
+        return pattern
+
+
 class YanagiCommandBase:
     # Instance Variables
     __sistana_snapshot__: AnalyzeSnapshot
@@ -39,8 +135,18 @@ class YanagiCommandBase:
     # Sistana Pattern
     __sistana_pattern__: ClassVar[SubcommandPattern]
 
+    # Lazy Construction, the context at the class creation and the subcommands registered before the pattern is built.
+    __yanagi_build_context__: ClassVar[Context | None] = None
+    __yanagi_lazy_subcommands__: ClassVar[list[type[YanagiCommandBase]]]
+
+    # Parse Result Construction, built on the first parse.
+    # Routes are per command path (by models), from the mangled fragment name to (index in the path, field name).
+    __yanagi_routes__: ClassVar[dict[tuple[type[YanagiCommandBase], ...], dict[str, tuple[int, str]]]]
+    __yanagi_constructor__: ClassVar[Callable[[dict[str, Any]], YanagiCommandBase] | None] = None
+
     # Sistana Bindings
-    __sistana_subcommands_bind__: ClassVar[ChainMap[str, SubcommandPattern]]
+    # NOTE: a `ChainMap` of layers until `freeze`, which collapses it into a dict.
+    __sistana_subcommands_bind__: ClassVar[MutableMapping[str, SubcommandPattern]]
     __sistana_options_bind__: ClassVar[ChainMap[str, OptionPattern]]
 
     @classmethod
@@ -94,12 +200,48 @@ class YanagiCommandBase:
 
         return f
 
+    @classmethod
+    def _restore_pattern(cls, command_pattern: SubcommandPattern, mangled_names: dict[str, str]):
+        cls.__yanagi_mangled_names__ = mangled_names
+
+        # NOTE: fragment groups belong to the class definition, they are mangled in place like `get_command_pattern` does.
+        for _, fragment_meta in field_metadata(cls):
+            if fragment_meta.group is not None:
+                fragment_meta.group.ident = cls._mangle_name(fragment_meta.group.ident)
+
+        cls.__sistana_subcommands_bind__ = command_pattern._subcommands
+        cls.__sistana_pattern__ = command_pattern
+
+        return command_pattern
+
     @classmethod
     def get_command_pattern(cls):
         # If pattern is already generated then return it.
         if hasattr(cls, "__sistana_pattern__"):
             return cls.__sistana_pattern__
 
+        # Lazy commands are built in the context of their creation, which carries the inherited binds and so on.
+        context = cls.__yanagi_build_context__
+
+        if context is None:
+            command_pattern = cls._build_command_pattern()
+        else:
+            command_pattern = context.run(cls._build_command_pattern)
+            cls.__yanagi_build_context__ = None
+
+        lazy_subcommands = cls.__dict__.get("__yanagi_lazy_subcommands__")
+
+        if lazy_subcommands:
+            guests = lazy_subcommands[:]
+            lazy_subcommands.clear()
+
+            for guest in guests:
+                guest.register_to(cls)
+
+        return command_pattern
+
+    @classmethod
+    def _build_command_pattern(cls):
         # If generated pattern is not found then generate.
 
         # Before generating from a "class", check if the class is a dataclass.
@@ -107,6 +249,15 @@ class YanagiCommandBase:
         if not is_dataclass(cls):
             raise TypeError("Command class must be a dataclass")
 
+        # Patterns built within an inheriting context refer to the binds of the host, which cannot be cached.
+        cache = YANAGI_PATTERN_CACHE.get()
+
+        if YANAGI_INHERITED_SUBCOMMANDS.get() is not None or YANAGI_INHERITED_OPTIONS.get() is not None:
+            cache = None
+
+        if cache is not None and (cached := cache.load(cls)) is not None:
+            return cls._restore_pattern(*cached)
+
         fields = dc_fields(cls)
 
         # Split fields into command fragments and option fragments.
@@ -240,11 +391,51 @@ class YanagiCommandBase:
         #        only refactor sistana/core to support this usage.
         command_pattern._options = cls._options_bind_factory(command_pattern._options).values()  # type: ignore
 
+        if cache is not None:
+            cache.store(cls, command_pattern, cls.__yanagi_mangled_names__)
+
         return command_pattern
 
     @classmethod
     def create_snapshot(cls, state: ProcessingState):
-        return cls.__sistana_pattern__.create_snapshot(state)
+        return cls.get_command_pattern().create_snapshot(state)
+
+    @classmethod
+    def _path_models(cls, command: list[str]) -> tuple[type[YanagiCommandBase], ...]:
+        models = [cls]
+
+        for command_node in command[1:]:
+            models.append(models[-1].__sistana_subcommands_bind__[command_node].__yanagi_model__)  # type: ignore
+
+        return tuple(models)
+
+    @classmethod
+    def _assignment_routes(cls, models: tuple[type[YanagiCommandBase], ...]):
+        cache = cls.__dict__.get("__yanagi_routes__")
+
+        if cache is None:
+            cache = cls.__yanagi_routes__ = {}
+
+        routes = cache.get(models)
+
+        if routes is None:
+            routes = cache[models] = {}
+
+            for index, model_cls in enumerate(models):
+                for mangled_name, field_name in model_cls.__yanagi_mangled_names__.items():
+                    # NOTE: a model repeated in the path takes the values at its first occurrence.
+                    routes.setdefault(mangled_name, (index, field_name))
+
+        return routes
+
+    @classmethod
+    def _construct(cls, values: dict[str, Any]):
+        constructor = cls.__dict__.get("__yanagi_constructor__")
+
+        if constructor is None:
+            constructor = cls.__yanagi_constructor__ = build_constructor(cls)
+
+        return constructor(values)
 
     @classmethod
     def parse(cls, buffer: Buffer, state: ProcessingState = ProcessingState.PREFIX):
@@ -254,34 +445,127 @@ class YanagiCommandBase:
         if isinstance(response, Rejected):
             raise ValueError(f"Command analysis failed (reason = {response.reason})") from response.exception
 
-        command_models: dict[type[YanagiCommandBase], YanagiCommandBase] = {}
-        current_command_model_cls = cls
+        models = cls._path_models(snapshot.command)
+        routes = cls._assignment_routes(models)
+        values: list[dict[str, Any]] = [{} for _ in models]
+        assignes = snapshot.mix.assignes
+
+        for name in [name for name in assignes if name in routes]:
+            index, field_name = routes[name]
+            values[index][field_name] = assignes.pop(name)
+
+        return YanagiParseResult(snapshot, models, values)
+
+    @classmethod
+    def freeze(cls):
+        """Freeze the pattern tree of the command (see `SubcommandPattern.freeze`), once every command is registered.
+
+        Commands in the tree are built if they are lazy, global binds registered later are not visible to the tree.
+        """
+
+        command_pattern = cls.get_command_pattern().freeze()
+        stack = [command_pattern]
+        visited: set[int] = set()
 
-        for command_node in snapshot.command:
-            if command_models:
-                current_command_model_cls: type[YanagiCommandBase] = current_command_model_cls.__sistana_subcommands_bind__[
-                    command_node
-                ].__yanagi_model__  # type: ignore
+        while stack:
+            pattern = stack.pop()
 
-            assignes = {}
+            if id(pattern) in visited:
+                continue
 
-            for k in list(snapshot.mix.assignes):
-                if k in current_command_model_cls.__yanagi_mangled_names__:
-                    assignes[current_command_model_cls.__yanagi_mangled_names__[k]] = snapshot.mix.assignes.pop(k)
+            visited.add(id(pattern))
 
-            model = current_command_model_cls(**assignes)
-            model.__sistana_snapshot__ = snapshot
-            command_models[current_command_model_cls] = model
+            model_cls = getattr(pattern, "__yanagi_model__", None)
+            if model_cls is not None:
+                model_cls.__sistana_subcommands_bind__ = pattern._subcommands
 
-        # TODO: YanagiParseResult class
-        return command_models
+            stack.extend(pattern._subcommands.values())
+
+        return cls
 
     @classmethod
     def register_to(cls, command: type[YanagiCommandBase]):
-        command.get_command_pattern().subcommand_from_pattern(cls.get_command_pattern())
+        if not hasattr(command, "__sistana_pattern__"):
+            # The host is lazy and not built yet, the guest will be registered along with it.
+            command.__yanagi_lazy_subcommands__.append(cls)
+            return cls
+
+        host = command.__sistana_pattern__
+        bind = host._subcommands
+
+        # A lazy guest is built on the first dispatch, unless it has a compact header, which has to be indexed by the host,
+        # or the bind of the host has been frozen.
+        if (
+            cls.__yanagi_build_context__ is not None
+            and not cls.__yanagi_subcommand_metadata__.compact_header
+            and isinstance(bind, ChainMap)
+        ):
+            if not isinstance(bind.maps[1], LazySubcommands):
+                bind.maps.insert(1, LazySubcommands(host))
+
+            bind.maps[1].add(cls)
+        else:
+            host.subcommand_from_pattern(cls.get_command_pattern())
+
         return cls
 
 
+class YanagiParseResult(Mapping["type[YanagiCommandBase]", YanagiCommandBase]):
+    """The models on the command path of a parse, keyed by model class.
+
+    Models are built on the first access, so checking the endpoint costs no construction at all.
+    """
+
+    __slots__ = ("indexes", "instances", "models", "snapshot", "values")
+
+    snapshot: AnalyzeSnapshot
+    models: tuple[type[YanagiCommandBase], ...]
+    values: list[dict[str, Any]]
+    indexes: dict[type[YanagiCommandBase], int]
+    instances: dict[type[YanagiCommandBase], YanagiCommandBase]
+
+    def __init__(self, snapshot: AnalyzeSnapshot, models: tuple[type[YanagiCommandBase], ...], values: list[dict[str, Any]]):
+        self.snapshot = snapshot
+        self.models = models
+        self.values = values
+        self.indexes = {}
+
+        # NOTE: a model repeated in the path is keyed by its first occurrence, which the values are routed to.
+        for index, model_cls in enumerate(models):
+            self.indexes.setdefault(model_cls, index)
+
+        self.instances = {}
+
+    @property
+    def endpoint(self) -> type[YanagiCommandBase]:
+        return self.models[-1]
+
+    @property
+    def endpoint_model(self):
+        return self[self.models[-1]]
+
+    def __getitem__(self, model_cls: type[YanagiCommandBase]) -> YanagiCommandBase:
+        model = self.instances.get(model_cls)
+
+        if model is None:
+            model = self.instances[model_cls] = model_cls._construct(self.values[self.indexes[model_cls]])
+            model.__sistana_snapshot__ = self.snapshot
+
+        return model
+
+    def __contains__(self, model_cls: object):
+        return model_cls in self.indexes
+
+    def __iter__(self):
+        return iter(self.indexes)
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __repr__(self):
+        return f"YanagiParseResult(endpoint={self.endpoint.__qualname__}, built={[i.__qualname__ for i in self.instances]})"
+
+
 # NOTE: field specifiers should be updated when new added.
 @dataclass_transform(field_specifiers=(fragment, header_fragment, fragment_union))
 class YanagiCommand(YanagiCommandBase):
@@ -295,6 +579,7 @@ class YanagiCommand(YanagiCommandBase):
         soft_keyword: bool = False,
         compact_header: bool = False,
         enter_instantly: bool = False,
+        lazy: bool = False,
     ) -> None:
         dataclass(cls)  # Ensure cls is a dataclass
 
@@ -307,4 +592,10 @@ class YanagiCommand(YanagiCommandBase):
             compact_header=compact_header,
             enter_instantly=enter_instantly,
         )
-        cls.get_command_pattern()
+        cls.__yanagi_lazy_subcommands__ = []
+
+        # With `lazy`, the pattern is built on the first use (e.g. parsing), instead of here.
+        cls.__yanagi_build_context__ = copy_context() if lazy else None
+
+        if not lazy:
+            cls.get_command_pattern()
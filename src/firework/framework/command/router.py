@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypeAlias, TypeVar
+
+from firework.util import FrozenRadixTrie, RadixTrie
+
+from .core.analyzer import Accepted, analyze_loopflow
+from .core.model.pattern import SubcommandPattern
+from .core.model.snapshot import ProcessingState
+
+if TYPE_CHECKING:
+    from elaina_segment import Buffer
+
+    from .core.analyzer import LoopflowResult
+    from .model import YanagiCommandBase
+
+T = TypeVar("T")
+
+_Entry: TypeAlias = "SubcommandPattern | type[YanagiCommandBase]"
+
+_PREFIX = 0
+_HEADER = 1
+_COMPACT_HEADER = 2
+
+
+class CommandRouter:
+    """Dispatches inputs to root patterns through one shared trie.
+
+    Every registered pattern contributes `prefix + header` (and `prefix + alias`) keys,
+    a single walk over the first segment of the input then yields every pattern that could accept it,
+    so the work is bounded by the input length instead of the amount of registered commands.
+    Lazy Yanagi commands which are not built yet are indexed by their metadata, and built once they are a candidate.
+    """
+
+    __slots__ = ("_entries", "_frozen", "_patterns", "_separators", "_trie")
+
+    _trie: RadixTrie[list[tuple[_Entry, int]]]
+    _frozen: FrozenRadixTrie[list[tuple[_Entry, int]]] | None
+    _entries: dict[str, list[tuple[_Entry, int]]]
+    _patterns: list[_Entry]
+    _separators: str
+
+    def __init__(self):
+        self._trie = RadixTrie()
+        self._frozen = None
+        self._entries = {}
+        self._patterns = []
+        self._separators = ""
+
+    def _index(self, key: str, entry: _Entry, kind: int):
+        entries = self._entries.get(key)
+
+        if entries is None:
+            entries = self._entries[key] = []
+            self._trie.set(key, entries)
+
+        entries.append((entry, kind))
+        self._frozen = None
+
+    def register(self, target: SubcommandPattern | type[YanagiCommandBase]):
+        if isinstance(target, SubcommandPattern):
+            entry = target
+        elif hasattr(target, "__sistana_pattern__"):
+            entry = target.__sistana_pattern__
+        else:
+            entry = target
+
+        self._patterns.append(entry)
+
+        if isinstance(entry, SubcommandPattern):
+            header, aliases, compact_header, separators = entry.header, entry.aliases, entry.compact_header, entry.separators
+            prefixes = [""] if entry.prefixes is None else entry.prefixes.keys()
+        else:
+            # NOTE: keep consistent with how `YanagiCommandBase.get_command_pattern` builds the pattern.
+            metadata = entry.__yanagi_subcommand_metadata__
+            header, aliases, prefixes = metadata.keyword, metadata.aliases, sorted(set(metadata.prefixes)) or [""]
+            compact_header, separators = metadata.compact_header, metadata.separators
+
+        for prefix in prefixes:
+            # NOTE: only the header itself could be compact, keep consistent with the analyzer.
+            self._index(prefix + header, entry, _COMPACT_HEADER if compact_header else _HEADER)
+
+            for alias in aliases:
+                self._index(prefix + alias, entry, _HEADER)
+
+            if prefix:
+                self._index(prefix, entry, _PREFIX)
+
+        self._separators = "".join({*self._separators, *separators})
+
+        return target
+
+    @property
+    def patterns(self):
+        # NOTE: builds every lazy command which is not built yet.
+        return tuple(i if isinstance(i, SubcommandPattern) else i.get_command_pattern() for i in self._patterns)
+
+    def candidates(self, buffer: Buffer[T]) -> list[SubcommandPattern]:
+        try:
+            first = buffer.first()
+        except IndexError:
+            return []
+
+        if not isinstance(first, str):
+            return []
+
+        # NOTE: lookups go through a frozen copy of the trie, rebuilt after registrations.
+        trie = self._frozen
+        if trie is None:
+            trie = self._frozen = self._trie.freeze()
+
+        first = first.lstrip(self._separators)
+        result: list[SubcommandPattern] = []
+        seen: set[int] = set()
+
+        # NOTE: more specific (longer) keys go first.
+        for key, entries in reversed(trie.matches(first)):
+            rest = first[len(key) :]
+
+            for entry, kind in entries:
+                pattern = entry if isinstance(entry, SubcommandPattern) else entry.get_command_pattern()
+
+                if id(pattern) in seen:
+                    continue
+
+                if kind == _PREFIX:
+                    # The header is expected in the next segment.
+                    if not rest or rest[0] not in pattern.separators:
+                        continue
+                elif rest and kind != _COMPACT_HEADER and rest[0] not in pattern.separators:
+                    continue
+
+                seen.add(id(pattern))
+                result.append(pattern)
+
+        return result
+
+    def analyze(self, buffer: Buffer[T]) -> LoopflowResult[T] | None:
+        """Analyze the buffer with the matched patterns, in order.
+
+        Each candidate works on a copy of the buffer, the first accepted result is returned,
+        otherwise the rejection from the most specific candidate. `None` means no pattern matches at all.
+        """
+
+        rejected = None
+
+        for pattern in self.candidates(buffer):
+            response = analyze_loopflow(pattern.create_snapshot(ProcessingState.PREFIX), buffer.copy())
+
+            if isinstance(response, Accepted):
+                return response
+
+            if rejected is None:
+                rejected = response
+
+        return rejected
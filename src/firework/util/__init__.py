@@ -7,4 +7,5 @@ from ._dcls import safe_dcls_kw as safe_dcls_kw
 from ._maybe import Maybe as Maybe
 from ._maybe import Some as Some
 from ._task_group import TaskGroup as TaskGroup
+from ._trie import FrozenRadixTrie as FrozenRadixTrie
 from ._trie import RadixTrie as RadixTrie
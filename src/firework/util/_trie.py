@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Generic, Iterable, TypeVar
+import heapq
+from typing import Any, Generic, Iterable, Iterator, Sequence, TypeVar
 
 from ._maybe import Maybe, Some
 
@@ -15,6 +16,23 @@ def _common_prefix_length(s1: str, s2: str) -> int:
     return ix + 1
 
 
+def _advance_row(row: list[int], edge: str, target: str, max_distance: int) -> list[int] | None:
+    # NOTE: Levenshtein DP, `row` holds the distances from the path so far to every prefix of `target`.
+    #       Returns None once no prefix of `target` is within `max_distance`, the subtree could be pruned.
+    for char in edge:
+        next_row = [row[0] + 1]
+
+        for j, target_char in enumerate(target, 1):
+            next_row.append(min(next_row[j - 1] + 1, row[j] + 1, row[j - 1] + (target_char != char)))
+
+        if min(next_row) > max_distance:
+            return None
+
+        row = next_row
+
+    return row
+
+
 class _RadixTrieNode:
     __slots__ = ["children", "value"]
 
@@ -138,6 +156,111 @@ class RadixTrie(Generic[T]):
 
         return None
 
+    def matches(self, key: str) -> list[tuple[str, T]]:
+        # NOTE: every stored key which is a prefix of `key`, collected in one walk, shortest first.
+        node = self.root
+        i = 0
+        key_len = len(key)
+        result: list[tuple[str, T]] = []
+
+        while i < key_len:
+            for edge, child in node.children.items():
+                length = _common_prefix_length(edge, key[i:])
+                if length == 0:
+                    continue
+
+                if length < len(edge):
+                    return result
+
+                i += length
+                node = child
+                if node.value is not None:
+                    result.append((key[:i], node.value.value))
+
+                break
+            else:
+                break
+
+        return result
+
+    def _locate_prefix(self, prefix: str) -> tuple[_RadixTrieNode, str] | None:
+        # NOTE: the topmost node whose key starts with `prefix`, along with its key.
+        node = self.root
+        i = 0
+        prefix_len = len(prefix)
+
+        while i < prefix_len:
+            rest = prefix[i:]
+
+            for edge, child in node.children.items():
+                if edge.startswith(rest):
+                    return child, prefix[:i] + edge
+
+                if rest.startswith(edge):
+                    i += len(edge)
+                    node = child
+                    break
+            else:
+                return None
+
+        return node, prefix
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        # NOTE: every stored key starting with `prefix`, lazily and in lexicographical order.
+        located = self._locate_prefix(prefix)
+        if located is None:
+            return iter(())
+
+        return self._iter_keys(*located)
+
+    def count_prefix(self, prefix: str) -> int:
+        located = self._locate_prefix(prefix)
+        if located is None:
+            return 0
+
+        count = 0
+        stack = [located[0]]
+        while stack:
+            node = stack.pop()
+            if node.value is not None:
+                count += 1
+            stack.extend(node.children.values())
+
+        return count
+
+    def iter_fuzzy(self, key: str, max_distance: int) -> Iterator[tuple[str, int]]:
+        """Every stored key within `max_distance` (Levenshtein) of `key`, with the distance, lazily.
+
+        Keys come in lexicographical order, subtrees that are already too far away are never visited.
+        """
+
+        stack = [(self.root, "", list(range(len(key) + 1)))]
+
+        while stack:
+            node, prefix, row = stack.pop()
+            if node.value is not None and row[-1] <= max_distance:
+                yield prefix, row[-1]
+
+            for edge in sorted(node.children, reverse=True):
+                next_row = _advance_row(row, edge, key, max_distance)
+                if next_row is not None:
+                    stack.append((node.children[edge], prefix + edge, next_row))
+
+    def nearest(self, key: str, k: int, max_distance: int) -> list[tuple[str, int]]:
+        # NOTE: the `k` closest keys, ties are broken in lexicographical order.
+        return heapq.nsmallest(k, self.iter_fuzzy(key, max_distance), key=lambda x: x[1])
+
+    @staticmethod
+    def _iter_keys(node: _RadixTrieNode, key: str) -> Iterator[str]:
+        stack = [(node, key)]
+
+        while stack:
+            node, key = stack.pop()
+            if node.value is not None:
+                yield key
+
+            stack.extend((node.children[edge], key + edge) for edge in sorted(node.children, reverse=True))
+
     def keys(self) -> list[str]:
         keys = []
         stack = [(self.root, "")]
@@ -175,6 +298,19 @@ class RadixTrie(Generic[T]):
         for key, value in items:
             self.set(key, value)
 
+    def freeze(self) -> FrozenRadixTrie[T]:
+        pairs: list[tuple[str, T]] = []
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if node.value is not None:
+                pairs.append((prefix, node.value.value))
+            for edge, child in node.children.items():
+                stack.append((child, prefix + edge))
+
+        pairs.sort(key=lambda x: x[0])
+        return FrozenRadixTrie.from_sorted([k for k, _ in pairs], [v for _, v in pairs])
+
     def __contains__(self, key: str) -> bool:
         node = self.root
         i = 0
@@ -195,3 +331,265 @@ class RadixTrie(Generic[T]):
                 return False
 
         return node.value is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+
+class FrozenRadixTrie(Generic[T]):
+    """A read-only radix trie, stored in parallel arrays indexed by node.
+
+    Children of a node are indexed by the first character of their edge, so each level is one dict probe
+    instead of a scan over the edges. Lookups walk the query with `str.startswith` and never build
+    intermediate keys, `longest_prefix_length` answers without allocating at all.
+    """
+
+    __slots__ = ("_children", "_counts", "_labels", "_terminal", "_values")
+
+    # NOTE: node 0 is the root, `_labels[i]` is the edge leading to node i,
+    #       `_counts[i]` is the amount of keys under node i (itself included).
+    _labels: list[str]
+    _children: list[dict[str, int]]
+    _terminal: list[bool]
+    _values: list[Any]
+    _counts: list[int]
+
+    def __init__(self):
+        self._labels = [""]
+        self._children = [{}]
+        self._terminal = [False]
+        self._values = [None]
+        self._counts = [0]
+
+    @classmethod
+    def from_sorted(cls, keys: Sequence[str], values: Sequence[T] | None = None) -> FrozenRadixTrie[T]:
+        """Build from strictly increasing keys, values default to the keys themselves."""
+
+        if values is None:
+            values = keys  # type: ignore
+        elif len(values) != len(keys):
+            raise ValueError("keys and values must have the same length")
+
+        for ix in range(1, len(keys)):
+            if keys[ix - 1] >= keys[ix]:
+                raise ValueError(f"keys must be sorted and unique, got {keys[ix - 1]!r} before {keys[ix]!r}")
+
+        trie = cls()
+        trie._counts[0] = len(keys)
+
+        if keys and keys[0] == "":
+            trie._terminal[0] = True
+            trie._values[0] = values[0]  # type: ignore
+            trie._build(0, keys, values, start=1, stop=len(keys), depth=0)  # type: ignore
+        else:
+            trie._build(0, keys, values, start=0, stop=len(keys), depth=0)  # type: ignore
+
+        return trie
+
+    def _build(self, parent: int, keys: Sequence[str], values: Sequence[T], *, start: int, stop: int, depth: int):
+        # NOTE: keys[start:stop] share `depth` characters, and all of them are longer than that.
+        while start < stop:
+            char = keys[start][depth]
+            end = start + 1
+            while end < stop and keys[end][depth] == char:
+                end += 1
+
+            first, last = keys[start], keys[end - 1]
+            length = depth + _common_prefix_length(first[depth:], last[depth:])
+
+            node = len(self._labels)
+            self._labels.append(first[depth:length])
+            self._children.append({})
+            self._counts.append(end - start)
+            self._children[parent][char] = node
+
+            if len(first) == length:
+                self._terminal.append(True)
+                self._values.append(values[start])
+                self._build(node, keys, values, start=start + 1, stop=end, depth=length)
+            else:
+                self._terminal.append(False)
+                self._values.append(None)
+                self._build(node, keys, values, start=start, stop=end, depth=length)
+
+            start = end
+
+    def _locate(self, key: str) -> int:
+        # NOTE: node whose path is exactly `key`, or -1.
+        children = self._children
+        labels = self._labels
+        node = 0
+        i = 0
+        key_len = len(key)
+
+        while i < key_len:
+            child = children[node].get(key[i])
+            if child is None:
+                return -1
+
+            label = labels[child]
+            if not key.startswith(label, i):
+                return -1
+
+            i += len(label)
+            node = child
+
+        return node
+
+    def longest_prefix_length(self, prefix: str) -> int:
+        children = self._children
+        labels = self._labels
+        terminal = self._terminal
+        node = 0
+        i = 0
+        last = 0 if terminal[0] else -1
+        prefix_len = len(prefix)
+
+        while i < prefix_len:
+            child = children[node].get(prefix[i])
+            if child is None:
+                break
+
+            label = labels[child]
+            if not prefix.startswith(label, i):
+                break
+
+            i += len(label)
+            node = child
+            if terminal[node]:
+                last = i
+
+        return last
+
+    def longest_prefix_key(self, prefix: str) -> str | None:
+        length = self.longest_prefix_length(prefix)
+        if length > 0:
+            return prefix[:length]
+
+        # NOTE: keep consistent with RadixTrie, an empty key never matches.
+        return None
+
+    def matches(self, key: str) -> list[tuple[str, T]]:
+        children = self._children
+        labels = self._labels
+        node = 0
+        i = 0
+        key_len = len(key)
+        result: list[tuple[str, T]] = []
+
+        while i < key_len:
+            child = children[node].get(key[i])
+            if child is None:
+                break
+
+            label = labels[child]
+            if not key.startswith(label, i):
+                break
+
+            i += len(label)
+            node = child
+            if self._terminal[node]:
+                result.append((key[:i], self._values[node]))
+
+        return result
+
+    def _locate_prefix(self, prefix: str) -> tuple[int, str] | None:
+        children = self._children
+        labels = self._labels
+        node = 0
+        i = 0
+        prefix_len = len(prefix)
+
+        while i < prefix_len:
+            child = children[node].get(prefix[i])
+            if child is None:
+                return None
+
+            label = labels[child]
+
+            if len(label) >= prefix_len - i:
+                if not label.startswith(prefix[i:]):
+                    return None
+
+                return child, prefix[:i] + label
+
+            if not prefix.startswith(label, i):
+                return None
+
+            i += len(label)
+            node = child
+
+        return node, prefix
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        located = self._locate_prefix(prefix)
+        if located is None:
+            return iter(())
+
+        return (key for key, _ in self._iter_nodes(*located))
+
+    def count_prefix(self, prefix: str) -> int:
+        located = self._locate_prefix(prefix)
+        if located is None:
+            return 0
+
+        return self._counts[located[0]]
+
+    def iter_fuzzy(self, key: str, max_distance: int) -> Iterator[tuple[str, int]]:
+        stack = [(0, "", list(range(len(key) + 1)))]
+
+        while stack:
+            node, prefix, row = stack.pop()
+            if self._terminal[node] and row[-1] <= max_distance:
+                yield prefix, row[-1]
+
+            children = self._children[node]
+            for char in sorted(children, reverse=True):
+                child = children[char]
+                label = self._labels[child]
+                next_row = _advance_row(row, label, key, max_distance)
+                if next_row is not None:
+                    stack.append((child, prefix + label, next_row))
+
+    def nearest(self, key: str, k: int, max_distance: int) -> list[tuple[str, int]]:
+        return heapq.nsmallest(k, self.iter_fuzzy(key, max_distance), key=lambda x: x[1])
+
+    def _iter_nodes(self, node: int, key: str) -> Iterator[tuple[str, int]]:
+        # NOTE: terminal nodes under `node` with their keys, in lexicographical order.
+        stack = [(node, key)]
+
+        while stack:
+            node, key = stack.pop()
+            if self._terminal[node]:
+                yield key, node
+
+            for char in sorted(self._children[node], reverse=True):
+                child = self._children[node][char]
+                stack.append((child, key + self._labels[child]))
+
+    def get(self, key: str, default: Any = None) -> T | Any:
+        node = self._locate(key)
+        if node >= 0 and self._terminal[node]:
+            return self._values[node]
+
+        return default
+
+    def keys(self) -> list[str]:
+        return [key for key, _ in self._iter_nodes(0, "")]
+
+    def values(self) -> list[Some[T]]:
+        # NOTE: wrapped as `RadixTrie.values` does.
+        return [Some(self._values[node]) for _, node in self._iter_nodes(0, "")]
+
+    def items(self) -> list[tuple[str, Some[T]]]:
+        return [(key, Some(self._values[node])) for key, node in self._iter_nodes(0, "")]
+
+    def __contains__(self, key: str) -> bool:
+        node = self._locate(key)
+        return node >= 0 and self._terminal[node]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self._iter_nodes(0, ""))
+
+    def __len__(self) -> int:
+        return self._counts[0]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from contextlib import suppress
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
@@ -9,23 +10,32 @@ from elaina_segment import AheadToken, Buffer, SegmentToken
 from elaina_segment.err import OutOfData
 
 from firework.framework.command.core.analyzer import LoopflowRejectReason, Rejected, analyze_loopflow
+from firework.framework.command.core.codegen import GeneratedParser
 from firework.framework.command.core.model.snapshot import AnalyzeSnapshot, ProcessingState
 
 if TYPE_CHECKING:
     from firework.framework.command.core.model.fragment import Fragment
-    from firework.framework.command.core.model.mix import Mix, Track
+    from firework.framework.command.core.model.mix import Mix, TrackView
     from firework.framework.command.core.model.pattern import SubcommandPattern
 
+# NOTE: set `SISTANA_ENGINE=codegen` to run the suite against the generated parsers.
+ENGINE = os.environ.get("SISTANA_ENGINE", "loopflow")
+
 
 def analyze(
     pattern: SubcommandPattern,
     buffer: Buffer,
     # complete_on_determined: bool = False,
 ):
-    snapshot = pattern.prefix_entrypoint
-    # analyzer = Analyzer(complete_on_determined)
+    if ENGINE == "codegen":
+        parser = GeneratedParser(pattern)
+        snapshot = parser.prefix_entrypoint
+        response = parser.analyze(snapshot, buffer)
+    else:
+        snapshot = pattern.prefix_entrypoint
+        # analyzer = Analyzer(complete_on_determined)
 
-    response = analyze_loopflow(snapshot, buffer)
+        response = analyze_loopflow(snapshot, buffer)
 
     if isinstance(response, Rejected):
         exit_reason = response.reason
@@ -131,7 +141,7 @@ class MixTest:
 @dataclass
 class TrackTest:
     mix: Mix
-    track: Track
+    track: TrackView
 
     def expect_emitted(self, expected: bool = True):
         assert self.track.emitted == expected
@@ -170,7 +180,7 @@ class TrackTest:
 @dataclass
 class FragmentTest:
     mix: Mix
-    track: Track
+    track: TrackView
     fragment: Fragment
 
     @property
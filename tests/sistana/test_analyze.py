@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from elaina_segment import Buffer
 
-from firework.framework.command.core import Fragment, SubcommandPattern
+from firework.framework.command.core import Accepted, Fragment, Rejected, SubcommandPattern, Suspended, analyze_loopflow
 from firework.framework.command.core.analyzer import LoopflowRejectReason
 from firework.framework.command.core.model.receiver import CountRx, Rx
+from firework.framework.command.core.model.snapshot import ProcessingState
 from firework.util import Some
 
 from .asserts import analyze
@@ -623,3 +624,42 @@ def test_header_fragment():
     frag_verbose_level = sn.mix[("test",), "-t"]["verbose_level"]
     frag_verbose_level.expect_assigned()
     frag_verbose_level.expect_value(20)
+
+
+def test_incremental():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age"))
+    pattern.subcommand("sub", Fragment("tail"))
+
+    snapshot = pattern.prefix_entrypoint
+    buffer = Buffer(["test alice --age"])
+
+    response = analyze_loopflow(snapshot, buffer, incremental=True)
+    assert isinstance(response, Suspended)
+    assert not response.satisfied
+    assert snapshot.state is ProcessingState.OPTION
+
+    # NOTE: the option track is kept as is, instead of being reset.
+    response = response.resume("18")
+    assert isinstance(response, Suspended)
+    assert response.satisfied
+    assert snapshot.mix.assignes == {"name": "alice", "age": "18"}
+
+    response = response.resume("sub bob")
+    assert isinstance(response, Suspended)
+
+    response = response.finish()
+    assert isinstance(response, Accepted)
+    assert snapshot.endpoint == ("test", "sub")
+    assert snapshot.mix.assignes == {"name": "alice", "age": "18", "tail": "bob"}
+
+
+def test_incremental_unsatisfied():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+
+    response = analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test"]), incremental=True)
+    assert isinstance(response, Suspended)
+
+    response = response.finish()
+    assert isinstance(response, Rejected)
+    assert response.reason == LoopflowRejectReason.unsatisfied
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import (
+    Accepted,
+    AnalyzeSummary,
+    Fragment,
+    LoopflowRejectReason,
+    Rejected,
+    SubcommandPattern,
+    analyze_many,
+)
+
+INPUTS = ["test alice", "test", "test bob --age 18", "hello"]
+
+
+def build_pattern():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age"))
+    return pattern
+
+
+def test_analyze_many():
+    results = list(analyze_many(build_pattern(), (Buffer([i]) for i in INPUTS)))
+
+    assert [type(i) for i in results] == [Rejected, Rejected, Accepted, Rejected]
+    assert results[2].mix.assignes == {"name": "bob", "age": "18"}
+    assert [i.reason for i in results if isinstance(i, Rejected)] == [
+        LoopflowRejectReason.unsatisfied,
+        LoopflowRejectReason.unsatisfied,
+        LoopflowRejectReason.header_mismatch,
+    ]
+
+
+def test_analyze_many_recycle():
+    assignes = [dict(i.snapshot.mix.assignes) for i in analyze_many(build_pattern(), (Buffer([i]) for i in INPUTS), recycle=True)]
+    assert assignes == [{"name": "alice"}, {}, {"name": "bob", "age": "18"}, {}]
+
+
+def test_analyze_many_executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(analyze_many(build_pattern, ([i] for i in INPUTS * 3), executor=executor, chunksize=2))
+
+    assert all(isinstance(i, AnalyzeSummary) for i in results)
+    assert [i.accepted for i in results] == [False, False, True, False] * 3
+    assert results[2].endpoint == ("test",)
+    assert results[2].assignes == {"name": "bob", "age": "18"}
+
+
+def build_batch_pattern(calls: list[int]):
+    def batch_int(values):
+        calls.append(len(values))
+        return [int(i) for i in values]
+
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age", batch_validator=lambda values: [i.isdigit() for i in values], batch_transformer=batch_int))
+    return pattern
+
+
+def test_analyze_many_deferred():
+    calls = []
+    inputs = ["test bob --age 18", "test alice --age x", "test carol --age 20"] * 2
+
+    results = list(analyze_many(build_batch_pattern(calls), (Buffer([i]) for i in inputs), deferred=True, chunksize=3))
+
+    assert calls == [2, 2]
+    assert [type(i) for i in results] == [Accepted, Rejected, Accepted] * 2
+    assert results[1].reason == LoopflowRejectReason.component_rejected
+    assert [i.mix.assignes["age"] for i in results if isinstance(i, Accepted)] == [18, 20, 18, 20]
+
+
+def test_batch_single():
+    calls = []
+    pattern = build_batch_pattern(calls)
+
+    results = list(analyze_many(pattern, (Buffer([i]) for i in ["test bob --age 18", "test alice --age x"])))
+
+    assert calls == [1]
+    assert results[0].mix.assignes["age"] == 18
+    assert results[1].reason == LoopflowRejectReason.component_rejected
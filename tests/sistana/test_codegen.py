@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import Fragment, GeneratedParser, SubcommandPattern, Suspended
+from firework.framework.command.core.analyzer import Rejected, analyze_loopflow
+from firework.util import Some
+
+
+def outcome(response):
+    snapshot = response.snapshot
+    reason = response.reason if isinstance(response, Rejected) else None
+    segment = response.segment if isinstance(response, Rejected) else None
+    return type(response), reason, segment, snapshot.endpoint, snapshot.mix.assignes, snapshot.mix.cursors
+
+
+def expect_equivalent(pattern: SubcommandPattern, *inputs: str):
+    parser = GeneratedParser(pattern)
+
+    for data in inputs:
+        expected = outcome(analyze_loopflow(pattern.prefix_entrypoint, Buffer([data])))
+        assert outcome(parser.analyze(parser.prefix_entrypoint, Buffer([data]))) == expected, data
+
+    return parser
+
+
+def test_codegen_subcommand():
+    lp = SubcommandPattern.build("lp", prefixes=["/", "."])
+    lp_user = lp.subcommand("user", Fragment("name"), aliases=["u"])
+    lp_user.subcommand("permission", Fragment("permission"), soft_keyword=True)
+    lp.subcommand("add", Fragment("tail"), compact_header=True)
+
+    parser = expect_equivalent(
+        lp,
+        "/lp user alice permission read",
+        ".lp u alice permission read",
+        "/lp user permission permission read",
+        "/lp add1",
+        "/lp add 1",
+        "/lp unknown",
+        "lp user alice",
+        "/lpx",
+    )
+
+    assert set(parser.sources) == {("lp",), ("lp", "user"), ("lp", "user", "permission"), ("lp", "add")}
+
+
+def test_codegen_option():
+    pattern = SubcommandPattern.build("mysql", Fragment("database", default=Some("test")), compact_header=True)
+    pattern.option("-u", Fragment("username"), compact_header=True)
+    pattern.option("-p", Fragment("password"), compact_header=True)
+    pattern.option("--host", Fragment("host"), header_separators="=")
+    pattern.option("--port", Fragment("port"), aliases=["-P"], soft_keyword=True)
+    pattern.option("--verbose", allow_duplicate=True)
+    sub = pattern.subcommand("dump", Fragment("table"))
+    sub.option("--where", Fragment("condition"), separators=",")
+
+    expect_equivalent(
+        pattern,
+        "mysql -uroot -ppassword --host=localhost -P 3306",
+        "mysqlprod -u root -p password --host localhost --port 3306",
+        "mysql -uroot -ppassword --host",
+        "mysql -uroot -uroot",
+        "mysql --verbose --verbose",
+        "mysql -uroot -p --port",
+        "mysql -uroot -p1 dump users --where id>1,name",
+        "mysql -uroot -p1 dump users --verbose extra",
+    )
+
+
+def test_codegen_incremental():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age"))
+    parser = GeneratedParser(pattern)
+
+    snapshot = parser.prefix_entrypoint
+    response = parser.analyze(snapshot, Buffer(["test alice --age"]), incremental=True)
+    assert isinstance(response, Suspended)
+
+    response = response.resume("18")
+    assert isinstance(response, Suspended)
+    assert response.finish().snapshot.mix.assignes == {"name": "alice", "age": "18"}
+
+    # NOTE: snapshots not created by the parser are handed over to the generic loopflow.
+    response = parser.analyze(pattern.prefix_entrypoint, Buffer(["test bob --age 1"]))
+    assert response.snapshot.mix.assignes == {"name": "bob", "age": "1"}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import Fragment, SubcommandPattern
+from firework.framework.command.core.analyzer import Rejected, analyze_loopflow
+from firework.framework.command.core.model.compiled import CompiledSnapshot
+
+
+def outcome(snapshot, data: list):
+    response = analyze_loopflow(snapshot, Buffer(data))
+    reason = response.reason if isinstance(response, Rejected) else None
+    return reason, snapshot.endpoint, snapshot.mix.assignes
+
+
+def expect_equivalent(pattern: SubcommandPattern, *inputs: list):
+    compiled = pattern.compile()
+
+    for data in inputs:
+        assert outcome(compiled.prefix_entrypoint, data) == outcome(pattern.prefix_entrypoint, data)
+
+
+def test_compiled_snapshot():
+    pattern = SubcommandPattern.build("test")
+    snapshot = pattern.compile().prefix_entrypoint
+
+    assert isinstance(snapshot, CompiledSnapshot)
+    assert snapshot.table.pattern is pattern
+
+
+def test_compiled_subcommand():
+    lp = SubcommandPattern.build("lp")
+    lp_user = lp.subcommand("user", Fragment("name"), aliases=["u"])
+    lp_user.subcommand("permission", Fragment("permission"), soft_keyword=True)
+    lp.subcommand("add", Fragment("tail"), compact_header=True)
+
+    expect_equivalent(
+        lp,
+        ["lp user alice permission read"],
+        ["lp u alice permission read"],
+        ["lp user permission permission read"],
+        ["lp add1"],
+        ["lp add 1"],
+        ["lp unknown"],
+    )
+
+
+def test_compiled_option():
+    pattern = SubcommandPattern.build("mysql")
+    pattern.option("-u", Fragment("username"), compact_header=True)
+    pattern.option("-p", Fragment("password"), compact_header=True)
+    pattern.option("--host", Fragment("host"), header_separators="=")
+    pattern.option("--port", Fragment("port"), aliases=["-P"])
+
+    expect_equivalent(
+        pattern,
+        ["mysql -uroot -ppassword --host=localhost -P 3306"],
+        ["mysql -u root -p password --host localhost --port 3306"],
+        ["mysql -uroot -ppassword --host"],
+        ["mysql -uroot -uroot"],
+    )
+
+
+def test_compiled_option_rank():
+    # NOTE: the first declared option wins, regardless of which kind of trigger matched.
+    pattern = SubcommandPattern.build("test")
+    pattern.option("-a", Fragment("a"), compact_header=True)
+    pattern.option("-ab", Fragment("ab"))
+    pattern.option("-abc", Fragment("abc"), compact_header=True)
+
+    expect_equivalent(pattern, ["test -ab"], ["test -abc"], ["test -abcd"])
+
+
+def test_compiled_forwarding():
+    pattern = SubcommandPattern.build("test")
+    pattern.option("--verbose", Fragment("verbose"))
+    pattern.option("--local", Fragment("local"), forwarding=False)
+    sub = pattern.subcommand("sub", Fragment("tail"))
+    sub.option("--name", Fragment("name"))
+
+    for i in range(40):
+        sub.option(f"--opt{i}", Fragment(f"opt{i}"), header_separators="=")
+
+    expect_equivalent(
+        pattern,
+        ["test --local x sub a --verbose 1 --name b"],
+        ["test --local x sub a --local y"],
+        ["test --local x sub a --opt39=1 --opt0 2"],
+        ["test sub a"],
+    )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import (
+    INSTRUMENTATION,
+    Fragment,
+    Instrumentation,
+    LoopflowRejectReason,
+    SubcommandPattern,
+    analyze_loopflow,
+)
+from firework.framework.command.core.model.mix import Track
+from firework.util import cvar
+
+
+def test_instrumentation():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age"))
+
+    instrumentation = Instrumentation()
+
+    with cvar(INSTRUMENTATION, instrumentation):
+        snapshot = pattern.prefix_entrypoint
+        response = analyze_loopflow(snapshot, buffer := Buffer(["test alice --age 18"]))
+
+        analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test"]))
+        analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test alice bob"]))
+
+    # NOTE: disabled outside of the context.
+    analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test alice"]))
+
+    assert response.buffer is buffer
+    assert all(type(track) is Track for track in snapshot.mix.tracks)
+
+    exported = []
+    instrumentation.export(lambda *item: exported.append(item))
+
+    [(exported_pattern, path, stats)] = exported
+    assert exported_pattern is pattern
+    assert path == ("test",)
+    assert stats.parses == 3
+    assert stats.accepts == 1
+    assert stats.rejects == {LoopflowRejectReason.unsatisfied: 1, LoopflowRejectReason.unexpected_segment: 1}
+    assert stats.fragments == 3  # alice, 18, alice
+    assert stats.tokens == 7  # NOTE: the unexpected "bob" is not consumed.
+    assert stats.elapsed > 0
+
+    assert instrumentation.stats == {}
+
+
+def test_instrumentation_same_header():
+    first = SubcommandPattern.build("test", Fragment("name"))
+    second = SubcommandPattern.build("test")
+
+    instrumentation = Instrumentation()
+
+    with cvar(INSTRUMENTATION, instrumentation):
+        analyze_loopflow(first.prefix_entrypoint, Buffer(["test alice"]))
+        analyze_loopflow(second.prefix_entrypoint, Buffer(["test"]))
+        analyze_loopflow(second.prefix_entrypoint, Buffer(["test"]))
+
+    exported = {}
+    instrumentation.export(lambda pattern, path, stats: exported.__setitem__(id(pattern), (path, stats.parses)))
+
+    assert exported == {id(first): (("test",), 1), id(second): (("test",), 2)}
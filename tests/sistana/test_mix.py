@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from elaina_segment import Buffer
 
-from firework.framework.command.core import Fragment, SubcommandPattern
+from firework.framework.command.core import Accepted, Fragment, SnapshotPool, SubcommandPattern, analyze_loopflow
+from firework.framework.command.core.analyzer import LoopflowRejectReason
 from firework.framework.command.core.model.receiver import Rx
+from firework.framework.command.core.model.snapshot import ProcessingState
 from firework.util import Some
 
 from .asserts import analyze
@@ -84,3 +86,98 @@ def test_variadic():
     frag = sn.mix[("test",)]["arg2"]
     frag.expect_assigned()
     frag.expect_value([])
+
+
+def test_track_layout_shared():
+    pat = SubcommandPattern.build("test")
+    pat.option("--name", Fragment("name"))
+    pat.option("--age", Fragment("age"))
+
+    a, sn, _ = analyze(pat, Buffer(["test --name alice"]))
+    a.expect(LoopflowRejectReason.unsatisfied)
+
+    mix = sn.snapshot.mix
+    assert mix.tracks[mix.option_id(("test",), "--name")] is pat.preset.option_tracks["--name"]
+    # NOTE: the unsatisfied "--name" is reset on rejection, yet it is still marked as emitted.
+    assert mix.cursors == [0, 0, 0]
+    assert mix.emitted == [True, True, False]
+
+
+def test_snapshot_clone():
+    pat = SubcommandPattern.build("test", Fragment("arg1"))
+    pat.option("--name", Fragment("name", default=Some("unknown")))
+    pat.subcommand("sub", Fragment("arg2"))
+
+    snapshot = pat.prefix_entrypoint
+    analyze_loopflow(snapshot, Buffer(["test x"]), incremental=True)
+
+    fork = snapshot.clone()
+    assert isinstance(analyze_loopflow(fork, Buffer(["sub y"])), Accepted)
+    assert isinstance(analyze_loopflow(snapshot, Buffer(["--name alice"])), Accepted)
+
+    assert fork.endpoint == ("test", "sub")
+    assert fork.mix.assignes == {"arg1": "x", "arg2": "y"}
+    assert snapshot.endpoint == ("test",)
+    assert snapshot.mix.assignes == {"arg1": "x", "name": "alice"}
+
+
+def test_snapshot_pool():
+    pat = SubcommandPattern.build("test", Fragment("arg1"))
+    pat.option("--name", Fragment("name", default=Some("unknown")))
+    pat.subcommand("sub", Fragment("arg2"))
+
+    pool = SnapshotPool(pat)
+
+    with pool.borrow(ProcessingState.PREFIX) as snapshot:
+        response = analyze_loopflow(snapshot, Buffer(["test x --name alice sub y"]))
+        assert isinstance(response, Accepted)
+        assert snapshot.endpoint == ("test", "sub")
+        assert snapshot.mix.assignes == {"arg1": "x", "name": "alice", "arg2": "y"}
+
+        cursors = snapshot.mix.cursors
+
+    with pool.borrow(ProcessingState.PREFIX) as reused:
+        assert reused is snapshot
+        assert reused.endpoint is None
+        assert reused.command == ["test"]
+
+        response = analyze_loopflow(reused, Buffer(["test z --name bob"]))
+        assert isinstance(response, Accepted)
+        assert reused.endpoint == ("test",)
+        assert reused.mix.assignes == {"arg1": "z", "name": "bob"}
+
+        # NOTE: the state arrays are recycled instead of allocating new ones.
+        assert reused.mix.cursors is cursors
+
+
+def test_satisfied_counters():
+    pat = SubcommandPattern.build("test", Fragment("arg1"), Fragment("arg2", default=Some("x")))
+    pat.option("--name", Fragment("name"))
+    pat.option("--local", Fragment("local"), forwarding=False)
+    pat.option("--flag")
+    sub = pat.subcommand("sub", Fragment("arg3"), enter_instantly=True)
+    sub.option("--age", Fragment("age"), forwarding=False)
+
+    inputs = [
+        "test",
+        "test a",
+        "test a --name",
+        "test a --name n --local l",
+        "test a --name n --local l sub",
+        "test a --name n sub b --age",
+        "test a --name n --local l sub b --age 1",
+    ]
+
+    for data in inputs:
+        snapshot = pat.prefix_entrypoint
+        response = analyze_loopflow(snapshot, Buffer([data]), incremental=True)
+        mix = snapshot.mix
+
+        expected = all(track.satisfied for track in (*mix.command_tracks.values(), *mix.option_tracks.values()))
+        assert response.satisfied == expected
+
+        current = tuple(snapshot.command)
+        expected = mix.command_tracks[current].satisfied and all(
+            track.satisfied for (owner, _), track in mix.option_tracks.items() if owner == current and not track.forwarding
+        )
+        assert snapshot.stage_satisfied == expected
@@ -58,3 +58,23 @@ def test_add_option():
     with pytest.raises(ValueError, match="header_separators must be used with fragments"):
         pat = SubcommandPattern.build("test", separators="|")
         pat.option("name", aliases=["--name"], header_separators="=")
+
+
+def test_register_many():
+    pat = SubcommandPattern.build("test")
+    pat.subcommand("add", Fragment("value"), compact_header=True, aliases=["plus"])
+    keywords = pat._compact_keywords
+
+    pat.register_many(
+        SubcommandPattern.build(f"cmd{i}", Fragment("value"), compact_header=i % 2 == 0, enter_instantly=False) for i in range(100)
+    )
+
+    assert pat._compact_keywords is keywords
+    assert sorted(keywords.keys()) == sorted(["add", "plus", *(f"cmd{i}" for i in range(0, 100, 2))])
+
+    a, sn, bf = analyze(pat, Buffer(["test cmd42x"]))
+    a.expect_completed()
+    sn.expect_endpoint("test", "cmd42")
+
+    a, sn, bf = analyze(pat, Buffer(["test cmd1x"]))
+    a.expect(LoopflowRejectReason.unexpected_segment)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command import YanagiCommand, fragment, option
+from firework.framework.command.cache import PatternCache
+from firework.framework.command.globals import YANAGI_PATTERN_CACHE
+from firework.util import cvar
+
+
+def define():
+    class Hello(YanagiCommand, keyword="hello"):
+        name: str = fragment(transformer=lambda val: val.title())
+
+        with option("--age"):
+            age: int = fragment(default=0, transformer=int)
+
+    return Hello
+
+
+def test_pattern_cache(tmp_path):
+    cache = PatternCache(tmp_path)
+
+    with cvar(YANAGI_PATTERN_CACHE, cache):
+        built = define()
+        assert len(list(tmp_path.iterdir())) == 1
+
+        loaded = define()
+
+    assert loaded.__sistana_pattern__ is not built.__sistana_pattern__
+    assert loaded.__sistana_pattern__.__yanagi_model__ is loaded  # type: ignore
+    assert loaded.__yanagi_mangled_names__ == built.__yanagi_mangled_names__
+
+    # NOTE: callables are taken from the class definition, not from the cache.
+    fragment_ = loaded.__sistana_pattern__.preset.subcommand_track.fragments[0]
+    assert fragment_.transformer is not built.__sistana_pattern__.preset.subcommand_track.fragments[0].transformer
+
+    result = loaded.parse(Buffer(["hello bob --age 18"]))
+    assert result[loaded] == loaded(name="Bob", age=18)  # type: ignore
+
+
+def test_pattern_cache_broken_entry(tmp_path):
+    cache = PatternCache(tmp_path)
+
+    with cvar(YANAGI_PATTERN_CACHE, cache):
+        define()
+
+        for path in tmp_path.iterdir():
+            path.write_bytes(b"broken")
+
+        loaded = define()
+
+    assert loaded.parse(Buffer(["hello bob"]))[loaded] == loaded(name="Bob")  # type: ignore
+
+
+def test_pattern_cache_stale_layout(tmp_path):
+    cache = PatternCache(tmp_path)
+
+    with cvar(YANAGI_PATTERN_CACHE, cache):
+        built = define()
+
+    path = cache.path_of(built)
+    cache.layout = b"another sistana"
+    assert cache.path_of(built) != path
+
+    # NOTE: an entry loading fine but missing attributes is a miss, not an error when parsing.
+    cache.layout = None
+    pattern = built.__sistana_pattern__
+    del pattern.preset.subcommand_track.regex_runs
+    cache.store(built, pattern, built.__yanagi_mangled_names__)
+
+    assert cache.load(built) is None
+
+    with cvar(YANAGI_PATTERN_CACHE, cache):
+        loaded = define()
+
+    assert loaded.parse(Buffer(["hello bob"]))[loaded] == loaded(name="Bob")  # type: ignore
+
+
+def test_pattern_cache_unwritable(tmp_path):
+    file = tmp_path / "file"
+    file.write_text("")
+
+    with cvar(YANAGI_PATTERN_CACHE, PatternCache(file / "cache")):
+        defined = define()
+
+    assert defined.parse(Buffer(["hello bob"]))[defined] == defined(name="Bob")  # type: ignore
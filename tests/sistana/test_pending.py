@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from elaina_segment import Buffer
+
+from firework.framework.command.core import Accepted, Fragment, SubcommandPattern
+from firework.framework.command.core.err import TransformPanic
+
+from .asserts import analyze
+
+
+def test_async_transformer_resolve():
+    active = 0
+    peak = 0
+
+    async def profile(val: str):
+        nonlocal active, peak
+
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+        return {"user": val.lstrip("@")}
+
+    pat = SubcommandPattern.build("test", Fragment("mentions", variadic=True, transformer=profile))
+    pat.option("--by", Fragment("by", transformer=profile))
+
+    a, sn, bf = analyze(pat, Buffer(["test @a @b @c --by @d"]))
+    a.expect_completed()
+
+    mix = sn.snapshot.mix
+    assert len(mix.pending) == 4
+
+    asyncio.run(Accepted(sn.snapshot, bf.buffer).resolve(limit=2))
+
+    assert not mix.pending
+    assert peak == 2
+    sn.mix.expect_assignes(mentions=[{"user": "a"}, {"user": "b"}, {"user": "c"}], by={"user": "d"})
+
+
+def test_async_transformer_failure():
+    async def fail(val: str):
+        raise ValueError(val)
+
+    pat = SubcommandPattern.build("test", Fragment("name", transformer=fail))
+
+    a, sn, _ = analyze(pat, Buffer(["test x"]))
+    a.expect_completed()
+
+    with pytest.raises(TransformPanic):
+        asyncio.run(sn.snapshot.mix.resolve())
+
+
+def test_async_header_transformer():
+    async def upper(val: str):
+        return val.upper()
+
+    pat = SubcommandPattern.build("test", Fragment("name"), header_fragment=Fragment("header", transformer=upper))
+
+    a, sn, bf = analyze(pat, Buffer(["test alice"]))
+    a.expect_completed()
+
+    assert [name for name, _, _ in sn.snapshot.mix.pending] == ["header"]
+
+    asyncio.run(Accepted(sn.snapshot, bf.buffer).resolve())
+    sn.mix.expect_assignes(header="TEST", name="alice")
@@ -3,7 +3,7 @@ from __future__ import annotations
 from elaina_segment import Buffer
 
 from firework.framework.command.core import Fragment, SubcommandPattern
-from firework.framework.command.core.model.receiver import AccumRx, ConstRx, CountRx
+from firework.framework.command.core.model.receiver import AccumRx, AddRx, ConstRx, CountRx, Rx
 
 from .asserts import analyze
 
@@ -45,3 +45,30 @@ def test_constrx():
     frag = sn.mix[("test",), "--name"].header
     frag.expect_assigned()
     frag.expect_value("hello")
+
+
+def test_addrx():
+    pat = SubcommandPattern.build("test")
+    pat.option("--add", Fragment("value", receiver=AddRx(), transformer=int), allow_duplicate=True)
+
+    a, sn, bf = analyze(pat, Buffer(["test --add 2 --add 3"]))
+    a.expect_completed()
+
+    frag = sn.mix[("test",), "--add"]["value"]
+    frag.expect_value(6)
+
+
+def test_custom_rx():
+    class JoinRx(Rx[str]):
+        def receive(self, fetch, prev, put):
+            v = prev()
+            put(fetch() if v is None else f"{v.value},{fetch()}")
+
+    pat = SubcommandPattern.build("test")
+    pat.option("--name", Fragment("names", receiver=JoinRx()), allow_duplicate=True)
+
+    a, sn, bf = analyze(pat, Buffer(["test --name a --name b"]))
+    a.expect_completed()
+
+    frag = sn.mix[("test",), "--name"]["names"]
+    frag.expect_value("a,b")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from elaina_segment import Buffer
+from elaina_segment.err import OutOfData
+
+from firework.framework.command.core import Fragment, SubcommandPattern
+from firework.framework.command.core.analyzer import LoopflowRejectReason
+from firework.framework.command.core.model.capture import RegexCapture
+
+from .asserts import analyze
+
+
+def test_regex_capture_precompiled():
+    capture = RegexCapture(r"\d+")
+
+    assert isinstance(capture.compiled, re.Pattern)
+    assert capture == RegexCapture(r"\d+")
+    assert hash(capture) == hash(RegexCapture(r"\d+"))
+
+
+def _date_pattern(fuse: bool):
+    return SubcommandPattern.build(
+        "test",
+        Fragment("year", capture=RegexCapture(r"\d{4}", fuse=fuse), transformer=lambda m: int(m[0])),
+        Fragment("month", capture=RegexCapture(r"-\d{2}", fuse=fuse), transformer=lambda m: int(m[0][1:])),
+        Fragment("day", capture=RegexCapture(r"-\d{2}", fuse=fuse), transformer=lambda m: int(m[0][1:])),
+    )
+
+
+def test_regex_fused():
+    pat = _date_pattern(fuse=True)
+    assert list(pat.preset.subcommand_track.regex_runs) == [0]
+
+    a, sn, _ = analyze(pat, Buffer(["test 2024-05-17"]))
+    a.expect_completed()
+    sn.mix.expect_assignes(year=2024, month=5, day=17)
+    sn.mix[("test",)].expect_satisfied()
+
+
+def test_regex_fused_same_as_unfused():
+    for raw in ["test 2024-05-17", "test 2024-05-17 extra", "test 2024-5-17", "test 2024"]:
+        a1, sn1, _ = analyze(_date_pattern(fuse=True), Buffer([raw]))
+        a2, sn2, _ = analyze(_date_pattern(fuse=False), Buffer([raw]))
+
+        assert a1.exit_reason == a2.exit_reason
+        if a1.exit_reason is None:
+            assert sn1.snapshot.mix.assignes == sn2.snapshot.mix.assignes
+
+
+def test_regex_fused_mismatch():
+    # NOTE: falls back to matching one by one, so the error is reported on the fragment which failed.
+    a, sn, _ = analyze(_date_pattern(fuse=True), Buffer(["test 2024/05/17"]))
+    a.expect(LoopflowRejectReason.component_rejected)
+
+    sn.mix.expect_assignes(year=2024)
+    assert "month" not in sn.snapshot.mix.assignes
+
+
+def test_regex_fused_leftover():
+    pat = SubcommandPattern.build(
+        "test",
+        Fragment("a", capture=RegexCapture(r"[a-z]+", fuse=True)),
+        Fragment("b", capture=RegexCapture(r"\d+", fuse=True)),
+        Fragment("c"),
+    )
+
+    a, sn, _ = analyze(pat, Buffer(["test abc123rest"]))
+    a.expect_completed()
+    assert sn.snapshot.mix.assignes["a"][0] == "abc"
+    assert sn.snapshot.mix.assignes["b"][0] == "123"
+    assert sn.snapshot.mix.assignes["c"] == "rest"
+
+
+def _pair_pattern(first: str, second: str, *, fuse: bool):
+    return SubcommandPattern.build(
+        "test",
+        Fragment("a", capture=RegexCapture(first, fuse=fuse), transformer=lambda m: m[0]),
+        Fragment("b", capture=RegexCapture(second, fuse=fuse), transformer=lambda m: m[0]),
+    )
+
+
+def test_regex_groups_not_fused():
+    # NOTE: groups would shift the group numbers (and break backreferences) inside the joint pattern.
+    for first, second, raw in [(r"(\d)", r"\d*", "test 123"), (r"(\w)\w*", r"\w*", "test abc"), (r"(?P<x>\d)", r"\d*", "test 123")]:
+        fused = _pair_pattern(first, second, fuse=True)
+        assert not fused.preset.subcommand_track.regex_runs
+
+        a1, sn1, _ = analyze(fused, Buffer([raw]))
+        a2, sn2, _ = analyze(_pair_pattern(first, second, fuse=False), Buffer([raw]))
+
+        assert a1.exit_reason == a2.exit_reason
+        assert sn1.snapshot.mix.assignes == sn2.snapshot.mix.assignes
+
+
+def test_regex_fused_out_of_data():
+    pat = _pair_pattern(r"\d", r"\d", fuse=True)
+    snapshot = pat.root_entrypoint
+    tid = snapshot.command_id
+
+    with pytest.raises(OutOfData):
+        snapshot.mix.tracks[tid].forward(snapshot.mix, tid, Buffer([]), " ")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command import CommandRouter
+from firework.framework.command.core import Accepted, Fragment, LoopflowRejectReason, Rejected, SubcommandPattern
+
+
+def test_router_candidates():
+    router = CommandRouter()
+    test = router.register(SubcommandPattern.build("test", Fragment("name"), aliases=["t"]))
+    tester = router.register(SubcommandPattern.build("tester", Fragment("name"), prefixes=["/", "."]))
+    add = router.register(SubcommandPattern.build("add", Fragment("value"), compact_header=True))
+
+    assert router.candidates(Buffer(["test alice"])) == [test]
+    assert router.candidates(Buffer(["t alice"])) == [test]
+    assert router.candidates(Buffer(["tester alice"])) == []
+    assert router.candidates(Buffer(["/tester alice"])) == [tester]
+    assert router.candidates(Buffer([".tester alice"])) == [tester]
+    assert router.candidates(Buffer(["/ tester alice"])) == [tester]
+    assert router.candidates(Buffer(["add1"])) == [add]
+    assert router.candidates(Buffer(["unknown"])) == []
+    assert router.candidates(Buffer([1, "test"])) == []
+
+
+def test_router_analyze():
+    router = CommandRouter()
+    router.register(SubcommandPattern.build("lp", Fragment("name"), compact_header=True))
+    lpx = router.register(SubcommandPattern.build("lpx", Fragment("name")))
+
+    response = router.analyze(Buffer(["lpx alice"]))
+    assert isinstance(response, Accepted)
+    assert response.snapshot.traverses["lpx",] is lpx
+    assert response.mix.assignes == {"name": "alice"}
+
+    response = router.analyze(Buffer(["lpalice"]))
+    assert isinstance(response, Accepted)
+    assert response.mix.assignes == {"name": "alice"}
+
+    # NOTE: "lpx" is unsatisfied, then falls back to the compact "lp".
+    response = router.analyze(Buffer(["lpx"]))
+    assert isinstance(response, Accepted)
+    assert response.snapshot.traverses["lp",] is not lpx
+    assert response.mix.assignes == {"name": "x"}
+
+    response = router.analyze(Buffer(["lpx alice bob"]))
+    assert isinstance(response, Rejected)
+    assert response.reason == LoopflowRejectReason.unexpected_segment
+    assert response.snapshot.traverses["lpx",] is lpx
+
+    assert router.analyze(Buffer(["unknown"])) is None
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer, Quoted
+
+from firework.framework.command.core import Accepted, Fragment, Rejected, SpeculativeGroup, SubcommandPattern
+from firework.framework.command.core.analyzer import LoopflowRejectReason
+from firework.framework.command.core.speculative import ReplayBuffer, SharedSegments
+
+
+def build_group():
+    lp = SubcommandPattern.build("lp", Fragment("name"), compact_header=True)
+    lp_user = SubcommandPattern.build("lp")
+    lp_user.subcommand("user", Fragment("user")).subcommand("permission", Fragment("permission"), soft_keyword=True)
+    lpx = SubcommandPattern.build("lpx", Fragment("name"))
+
+    return lp, lp_user, lpx, SpeculativeGroup([lpx, lp_user, lp.compile()])
+
+
+def test_speculative_shared():
+    lp, _, _, group = build_group()
+    assert group.separators == " "
+
+    responses = group.analyze_all(Buffer(["lp user alice permission read"]))
+    assert len(responses) == 1
+    assert responses[0].snapshot.endpoint == ("lp", "user", "permission")
+    assert isinstance(responses[0].buffer, ReplayBuffer)
+
+    responses = group.analyze_all(Buffer(["lpx alice"]))
+    assert [i.mix.assignes for i in responses] == [{"name": "alice"}]
+
+    responses = group.analyze_all(Buffer(['lpx "alice bob"']))
+    assert [i.mix.assignes["name"] for i in responses] == [Quoted(["alice bob"], '"', '"')]
+
+    # NOTE: the compact header tail is pushed back into the reader of "lp" only.
+    response = group.analyze_first(Buffer(["lpx"]))
+    assert isinstance(response, Accepted)
+    assert response.snapshot.traverses["lp",] is lp
+    assert response.mix.assignes == {"name": "x"}
+
+    response = group.analyze_first(Buffer(["unknown"]))
+    assert isinstance(response, Rejected)
+    assert response.reason == LoopflowRejectReason.header_mismatch
+
+
+def test_speculative_fallback():
+    test = SubcommandPattern.build("test", Fragment("name"))
+    test.option("--tag", Fragment("tag"), separators="=")
+    group = SpeculativeGroup([test, SubcommandPattern.build("test", Fragment("name"), Fragment("tag"))])
+
+    assert group.separators is None
+
+    responses = group.analyze_all(Buffer(["test alice --tag x"]))
+    assert [i.mix.assignes for i in responses] == [{"name": "alice", "tag": "x"}]
+
+
+def test_speculative_fragment_separators():
+    cmd = SubcommandPattern.build("cmd", Fragment("a", separators=","), Fragment("b"))
+    group = SpeculativeGroup([cmd])
+
+    assert group.separators is None
+
+    response = group.analyze_first(Buffer(["cmd x,y"]))
+    assert isinstance(response, Accepted)
+    assert response.mix.assignes == {"a": "x", "b": "y"}
+
+
+def test_replay_buffer():
+    shared = SharedSegments(Buffer(["a b", 1]), " ")
+    first, second = ReplayBuffer(shared), ReplayBuffer(shared)
+
+    token = first.next()
+    assert token.val == "a"
+    token.apply()
+
+    first.pushleft("x")
+    assert first.first() == "x"
+    copied = first.copy()
+
+    token = first.next()
+    assert token.val == "x"
+    token.apply()
+
+    assert first.next().val == "b"
+    assert second.next().val == "a"
+    assert copied.first() == "x"
+    assert shared.segments == ["a", "b"]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import Fragment, LoopflowRejectReason, Rejected, SubcommandPattern, analyze_loopflow, suggest
+
+
+def build_pattern():
+    pattern = SubcommandPattern.build("lp", prefixes=["/"])
+    pattern.option("--verbose", aliases=["-v"])
+    pattern.option("--name", Fragment("name"))
+    pattern.option("-u", Fragment("user"), compact_header=True)
+    user = pattern.subcommand("user", Fragment("target"))
+    user.subcommand("permission", Fragment("permission"))
+    pattern.subcommand("update")
+    return pattern.compile()
+
+
+def test_suggest_header():
+    compiled = build_pattern()
+
+    assert suggest(compiled).headers == ["/lp"]
+    assert suggest(compiled, Buffer(["/"])).headers == ["lp"]
+
+
+def test_suggest_keywords():
+    compiled = build_pattern()
+
+    result = suggest(compiled, Buffer(["/lp"]))
+    assert result.subcommands == ["update", "user"]
+    assert result.options == ["--name", "--verbose", "-u", "-v"]
+    assert result.fragments == []
+
+    result = suggest(compiled, Buffer(["/lp --verbose"]), "-")
+    assert result.subcommands == []
+    assert result.options == ["--name", "-u"]
+
+    result = suggest(compiled, Buffer(["/lp"]), "u")
+    assert result.subcommands == ["update", "user"]
+    assert result.options == []
+
+
+def test_suggest_fragments():
+    compiled = build_pattern()
+
+    result = suggest(compiled, Buffer(["/lp --name"]))
+    assert result.fragments == ["name"]
+    assert not result.options
+    assert not result.subcommands
+
+    result = suggest(compiled, Buffer(["/lp user"]))
+    assert result.fragments == ["target"]
+    assert result.subcommands == []
+
+    result = suggest(compiled, Buffer(["/lp user alice"]), "p")
+    assert result.subcommands == ["permission"]
+
+    assert not suggest(compiled, Buffer(["/lp unknown"]))
+
+
+def test_rejected_suggestions():
+    pattern = SubcommandPattern.build("git", aliases=["g"])
+    pattern.subcommand("commit", Fragment("message"))
+    pattern.subcommand("checkout", Fragment("branch"))
+    pattern.subcommand("cherry-pick", Fragment("commit"))
+    pattern.option("--version")
+
+    for target in (pattern, pattern.compile()):
+        response = analyze_loopflow(target.prefix_entrypoint, Buffer(["gitt commit x"]))
+        assert isinstance(response, Rejected)
+        assert response.reason == LoopflowRejectReason.header_mismatch
+        assert response.suggestions() == ["git"]
+
+        response = analyze_loopflow(target.prefix_entrypoint, Buffer(["git comit x"]))
+        assert isinstance(response, Rejected)
+        assert response.reason == LoopflowRejectReason.unexpected_segment
+        assert response.segment == "comit"
+        assert response.suggestions() == ["commit"]
+
+        response = analyze_loopflow(target.prefix_entrypoint, Buffer(["git --versoin"]))
+        assert response.suggestions(max_distance=1) == []
+        assert response.suggestions() == ["--version"]
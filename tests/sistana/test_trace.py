@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from elaina_segment import Buffer
+
+from firework.framework.command.core import (
+    TRACE_RECORDER,
+    Fragment,
+    LoopflowRejectReason,
+    SubcommandPattern,
+    TraceRecorder,
+    analyze_loopflow,
+)
+from firework.framework.command.core.model.mix import Track
+from firework.util import cvar
+
+
+def test_trace_recorder():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    pattern.option("--age", Fragment("age"))
+
+    recorder = TraceRecorder()
+
+    with cvar(TRACE_RECORDER, recorder):
+        snapshot = pattern.prefix_entrypoint
+        response = analyze_loopflow(snapshot, buffer := Buffer(["test alice --age 18"]))
+        analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test alice bob"]))
+
+    analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test alice"]))
+
+    assert response.buffer is buffer
+    assert all(type(track) is Track for track in snapshot.mix.tracks)
+
+    accepted, rejected = recorder.dump()
+    assert accepted.splitlines() == [
+        "#0 test [prefix]",
+        "  state prefix -> header",
+        "  token 'test'",
+        "  state header -> command",
+        "  token 'alice'",
+        "  capture name = 'alice'",
+        "  state command -> option",
+        "  token '--age'",
+        "  token '18'",
+        "  capture age = '18'",
+        "  state option -> command",
+        "  accepted at test",
+    ]
+    assert rejected.splitlines()[-1] == f"  rejected: {LoopflowRejectReason.unexpected_segment} at test"
+    assert recorder.dump(last=1) == [rejected]
+
+
+def test_trace_recorder_bounded():
+    pattern = SubcommandPattern.build("test", Fragment("name"))
+    recorder = TraceRecorder(capacity=8)
+
+    with cvar(TRACE_RECORDER, recorder):
+        for _ in range(4):
+            analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test alice"]))
+
+    assert len(recorder.events) == 8
+
+    traces = recorder.dump()
+    assert traces[0].startswith("#2 (truncated)")
+    assert traces[-1].startswith("#3 test")
+
+
+def test_trace_enter_subcommand():
+    pattern = SubcommandPattern.build("test")
+    pattern.subcommand("sub", Fragment("name"))
+
+    recorder = TraceRecorder()
+
+    with cvar(TRACE_RECORDER, recorder):
+        analyze_loopflow(pattern.prefix_entrypoint, Buffer(["test sub alice"]))
+
+    assert recorder.dump()[0].splitlines()[4:] == [
+        "  token 'sub'",
+        "  enter test sub",
+        "  token 'alice'",
+        "  capture name = 'alice'",
+        "  accepted at test sub",
+    ]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from firework.util import FrozenRadixTrie, RadixTrie
+
+
+def test_frozen_trie_equivalent():
+    rng = random.Random(0)  # noqa: S311 (a seeded RNG generating test keys)
+    keys = {"".join(rng.choice("abc-") for _ in range(rng.randint(1, 6))) for _ in range(200)}
+
+    trie = RadixTrie[str]()
+    for key in keys:
+        trie.set(key, key.upper())
+
+    frozen = trie.freeze()
+    assert len(frozen) == len(keys)
+    assert frozen.keys() == sorted(keys)
+    assert list(frozen) == frozen.keys()
+    assert sorted(trie) == sorted(keys)
+    assert frozen.items() == sorted(trie.items(), key=lambda x: x[0])
+
+    for _ in range(500):
+        query = "".join(rng.choice("abc-d") for _ in range(rng.randint(0, 8)))
+
+        assert frozen.longest_prefix_key(query) == trie.longest_prefix_key(query)
+        assert frozen.matches(query) == trie.matches(query)
+        assert list(frozen.iter_prefix(query)) == list(trie.iter_prefix(query))
+        assert (query in frozen) == (query in trie)
+        assert frozen.get(query) == (query.upper() if query in keys else None)
+
+
+def test_frozen_trie_from_sorted():
+    frozen = FrozenRadixTrie.from_sorted(["-", "--", "--help", "-h"])
+
+    assert frozen.longest_prefix_length("--helpme") == 6
+    assert frozen.longest_prefix_key("-x") == "-"
+    assert frozen.longest_prefix_length("x") == -1
+    assert frozen.matches("--help") == [("-", "-"), ("--", "--"), ("--help", "--help")]
+    assert list(frozen.iter_prefix("--")) == ["--", "--help"]
+
+    with pytest.raises(ValueError, match="sorted"):
+        FrozenRadixTrie.from_sorted(["b", "a"])
+
+
+def levenshtein(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+
+    return row[-1]
+
+
+def test_trie_prefix_and_fuzzy():
+    rng = random.Random(1)  # noqa: S311 (a seeded RNG generating test keys)
+    keys = sorted({"".join(rng.choice("abcd") for _ in range(rng.randint(1, 7))) for _ in range(300)})
+
+    trie = RadixTrie[str]()
+    for key in keys:
+        trie.set(key, key)
+
+    frozen = trie.freeze()
+
+    for _ in range(100):
+        query = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 6)))
+
+        expected = sum(1 for key in keys if key.startswith(query))
+        assert trie.count_prefix(query) == frozen.count_prefix(query) == expected
+
+        expected = [(key, levenshtein(query, key)) for key in keys if levenshtein(query, key) <= 2]
+        assert list(trie.iter_fuzzy(query, 2)) == list(frozen.iter_fuzzy(query, 2)) == expected
+
+        nearest = frozen.nearest(query, 3, 2)
+        assert nearest == trie.nearest(query, 3, 2)
+        assert nearest == sorted(expected, key=lambda x: x[1])[:3]
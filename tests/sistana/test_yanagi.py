@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import pytest
+from elaina_segment import Buffer
+
+from firework.framework.command import CommandRouter, YanagiCommand, YanagiParseResult, fragment, option, subcommand_of
+from firework.framework.command.model import build_constructor
+
+
+def test_lazy_command():
+    class Admin(YanagiCommand, keyword="admin", lazy=True):
+        action: str = fragment()
+
+    @subcommand_of(Admin)
+    class Ban(YanagiCommand, keyword="ban", lazy=True):
+        user: str = fragment()
+
+    assert "__sistana_pattern__" not in Admin.__dict__
+    assert "__sistana_pattern__" not in Ban.__dict__
+
+    result = Admin.parse(Buffer(["admin run ban alice"]))
+
+    assert result[Admin] == Admin(action="run")  # type: ignore
+    assert result[Ban] == Ban(user="alice")  # type: ignore
+    assert Admin.__yanagi_build_context__ is None
+
+
+def test_lazy_subcommand_of_eager():
+    class Root(YanagiCommand, keyword="root"):
+        name: str = fragment(default="-")
+
+    @subcommand_of(Root)
+    class Admin(YanagiCommand, keyword="admin", aliases=["adm"], lazy=True):
+        action: str = fragment()
+
+    assert "__sistana_pattern__" in Root.__dict__
+    assert "__sistana_pattern__" not in Admin.__dict__
+
+    result = Root.parse(Buffer(["root"]))
+    assert result.endpoint is Root
+    assert "__sistana_pattern__" not in Admin.__dict__
+
+    result = Root.parse(Buffer(["root adm run"]))
+    assert result[Admin] == Admin(action="run")  # type: ignore
+    assert Root.__sistana_subcommands_bind__["admin"] is Admin.__sistana_pattern__
+
+
+def test_lazy_command_router():
+    class Sudo(YanagiCommand, keyword="sudo", prefixes=["/"], lazy=True):
+        name: str = fragment()
+
+    router = CommandRouter()
+    router.register(Sudo)
+
+    assert "__sistana_pattern__" not in Sudo.__dict__
+    assert router.candidates(Buffer(["echo"])) == []
+    assert "__sistana_pattern__" not in Sudo.__dict__
+
+    assert router.candidates(Buffer(["/sudo alice"])) == [Sudo.__sistana_pattern__]
+    assert router.patterns == (Sudo.__sistana_pattern__,)
+
+
+def test_parse_routes():
+    class Git(YanagiCommand, keyword="git"):
+        with option("--work-tree"):
+            work_tree: str = fragment(default=".")
+
+    @subcommand_of(Git)
+    class Push(YanagiCommand, keyword="push"):
+        remote: str = fragment()
+        refs: list[str] = fragment(variadic=True)
+
+    result = Git.parse(Buffer(["git push origin main dev"]))
+
+    assert result[Git] == Git(work_tree=".")  # type: ignore
+    assert result[Push] == Push(remote="origin", refs=["main", "dev"])  # type: ignore
+    assert list(Git.__yanagi_routes__) == [(Git, Push)]
+    assert Git.__yanagi_routes__[Git, Push][Push._mangle_name("remote")] == (1, "remote")
+
+
+def test_build_constructor():
+    @dataclass
+    class Plain:
+        a: int
+        b: int = 2
+        c: list[int] = field(default_factory=list)
+
+        def __post_init__(self):
+            self.c.append(self.a)
+
+    @dataclass(frozen=True)
+    class Frozen:
+        a: int
+
+    @dataclass
+    class Custom:
+        a: int
+
+        def __init__(self, a: int):
+            self.a = a * 2
+
+    construct = build_constructor(Plain)
+
+    assert construct({"a": 1}) == Plain(1)
+    assert construct({"a": 1, "c": [0]}).c == [0, 1]
+    assert build_constructor(Frozen)({"a": 1}) == Frozen(1)
+    assert build_constructor(Custom)({"a": 1}).a == 2
+
+    with pytest.raises(TypeError):
+        construct({})
+
+
+def test_parse_result_lazy():
+    built = []
+
+    class Root(YanagiCommand, keyword="root"):
+        def __post_init__(self):
+            built.append(Root)
+
+    @subcommand_of(Root)
+    class Leaf(YanagiCommand, keyword="leaf"):
+        name: str = fragment()
+
+        def __post_init__(self):
+            built.append(Leaf)
+
+    result = Root.parse(Buffer(["root leaf alice"]))
+
+    assert isinstance(result, YanagiParseResult)
+    assert result.endpoint is Leaf
+    assert list(result) == [Root, Leaf]
+    assert built == []
+
+    assert result.endpoint_model == Leaf(name="alice")  # type: ignore
+    assert result[Leaf] is result.endpoint_model
+    assert built == [Leaf, Leaf]  # NOTE: the second one is the comparand.
+    assert Root in result and dict(result)[Root].__sistana_snapshot__ is result.snapshot
+
+
+def test_freeze():
+    class Repo(YanagiCommand, keyword="repo"):
+        with option("--quiet"):
+            quiet: str = fragment(default="no")
+
+    @subcommand_of(Repo)
+    class Clone(YanagiCommand, keyword="clone"):
+        url: str = fragment()
+
+    Repo.freeze()
+
+    pattern = Repo.__sistana_pattern__
+    assert type(pattern._subcommands) is dict
+    assert type(pattern._options) is tuple
+    assert Clone.__sistana_pattern__._options == ()
+    assert Repo.__sistana_subcommands_bind__ is pattern._subcommands
+
+    with pytest.raises(RuntimeError, match="pattern is frozen"):
+        pattern.option("--verbose")
+
+    result = Repo.parse(Buffer(["repo --quiet yes clone x"]))
+    assert result[Repo] == Repo(quiet="yes")  # type: ignore
+    assert result[Clone] == Clone(url="x")  # type: ignore